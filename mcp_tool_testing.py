@@ -9,12 +9,42 @@ Comprehensive testing for individual MCP tools including:
 - Performance testing
 """
 
+import asyncio
+import itertools
 import json
-import subprocess
 import sys
 import time
 import base64
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import msgspec
+
+# Optional: full JSON Schema checks when jsonschema is installed
+try:
+    from jsonschema import Draft7Validator
+    from jsonschema.exceptions import SchemaError
+except ImportError:
+    Draft7Validator = None
+
+class Request(msgspec.Struct, omit_defaults=True):
+    """JSON-RPC request sent to the server"""
+    jsonrpc: str
+    method: str
+    id: int
+    params: Optional[Dict[str, Any]] = None
+
+class Response(msgspec.Struct):
+    """JSON-RPC response read back from the server"""
+    jsonrpc: str = "2.0"
+    id: Union[int, str, None] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+
+_request_encoder = msgspec.json.Encoder()
+_response_decoder = msgspec.json.Decoder(Response)
+
+# Responses carry base64 screenshots, so allow long lines from the server
+MAX_RESPONSE_LINE = 32 * 1024 * 1024
 
 class MCPToolTester:
     """Framework for testing MCP tools systematically"""
@@ -22,60 +52,138 @@ class MCPToolTester:
     def __init__(self, server_command):
         self.server_command = server_command
         self.process = None
-
-    def start_server(self):
+        # Compiled validators keyed by (tool name, schema hash), reused for every tools/call
+        self._validator_cache: Dict[Tuple[str, int], Any] = {}
+        # tools/list inputSchemas by tool name, fetched once on the first checked call
+        self._tool_schemas: Optional[asyncio.Task] = None
+        # In-flight requests awaiting a response, keyed by JSON-RPC id
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count(1)
+        self._reader_task = None
+
+    async def start_server(self):
         """Start the MCP server"""
-        self.process = subprocess.Popen(
-            self.server_command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        self.process = await asyncio.create_subprocess_exec(
+            *self.server_command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=MAX_RESPONSE_LINE
         )
+        self._reader_task = asyncio.create_task(self._read_responses())
 
         # Initialize the server
-        init_response = self.send_request("initialize", {
+        init_response = await self.send_request("initialize", {
             "protocolVersion": "2024-11-05",
             "capabilities": {"tools": {}},
             "clientInfo": {"name": "tool-tester", "version": "1.0.0"}
         })
 
-        return init_response.get("result") is not None
+        return init_response.result is not None
 
-    def stop_server(self):
+    async def stop_server(self):
         """Stop the MCP server"""
         if self.process:
             self.process.terminate()
-            self.process.wait()
-
-    def send_request(self, method: str, params: Optional[Dict] = None, request_id: int = 1) -> Dict[str, Any]:
-        """Send JSON-RPC request and return response"""
-        request = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": request_id
-        }
+            await self.process.wait()
+        if self._reader_task:
+            self._reader_task.cancel()
 
-        if params:
-            request["params"] = params
-
-        self.process.stdin.write(json.dumps(request) + "\n")
-        self.process.stdin.flush()
-
-        response_line = self.process.stdout.readline()
-        return json.loads(response_line.strip()) if response_line else {}
-
-    def test_tool_schema_validation(self):
+    async def _read_responses(self):
+        """Demultiplex server responses to the pending requests by id"""
+        reason = "server closed its output"
+        try:
+            while line := await self.process.stdout.readline():
+                try:
+                    response = _response_decoder.decode(line)
+                except msgspec.DecodeError as e:
+                    print(f"⚠️  Skipping unreadable server line: {e}: {line[:200]!r}", file=sys.stderr)
+                    continue
+                if response.id is None:
+                    print(f"⚠️  Skipping server message without an id: {line[:200]!r}", file=sys.stderr)
+                    continue
+                future = self._pending.pop(response.id, None)
+                if future and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            reason = f"reading server output failed: {e}"
+        finally:
+            # No more responses can arrive: fail anything still waiting
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"MCP {reason}"))
+            self._pending.clear()
+
+    async def send_request(self, method: str, params: Optional[Dict] = None, request_id: Optional[int] = None) -> Response:
+        """Send JSON-RPC request and return response.
+
+        Requests are pipelined: several may be in flight at once, each matched
+        to its response by a unique id.
+        """
+        if request_id is None:
+            request_id = next(self._request_ids)
+
+        if self._reader_task is None or self._reader_task.done():
+            raise ConnectionError("MCP server is not running: its response reader has stopped")
+
+        request = Request(jsonrpc="2.0", method=method, id=request_id, params=params or None)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        self.process.stdin.write(_request_encoder.encode(request) + b"\n")
+        await self.process.stdin.drain()
+
+        return await future
+
+    def _get_validator(self, tool_name: str, schema: Dict[str, Any]):
+        """Return a cached Draft7Validator for a tool schema, checking the schema once on first build"""
+        key = (tool_name, hash(json.dumps(schema, sort_keys=True)))
+        validator = self._validator_cache.get(key)
+        if validator is None:
+            Draft7Validator.check_schema(schema)
+            validator = Draft7Validator(schema)
+            self._validator_cache[key] = validator
+        return validator
+
+    async def _fetch_tool_schemas(self) -> Dict[str, Dict[str, Any]]:
+        """inputSchema of every tool in tools/list, by tool name"""
+        response = await self.send_request("tools/list")
+        if not response.result:
+            return {}
+        return {tool["name"]: tool["inputSchema"] for tool in response.result["tools"] if "inputSchema" in tool}
+
+    async def _argument_errors(self, tool_name: str, arguments: Dict[str, Any]) -> List[str]:
+        """Messages for arguments that break the tool's inputSchema, checked with its cached validator.
+
+        Empty when jsonschema isn't installed or the tool isn't listed.
+        """
+        if Draft7Validator is None:
+            return []
+        if self._tool_schemas is None:
+            self._tool_schemas = asyncio.create_task(self._fetch_tool_schemas())
+        schema = (await self._tool_schemas).get(tool_name)
+        if schema is None:
+            return []
+        return [error.message for error in self._get_validator(tool_name, schema).iter_errors(arguments)]
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[Response, List[str]]:
+        """tools/call, returning the response and any schema errors in the arguments sent"""
+        argument_errors = await self._argument_errors(tool_name, arguments)
+        response = await self.send_request("tools/call", {"name": tool_name, "arguments": arguments})
+        return response, argument_errors
+
+    async def test_tool_schema_validation(self):
         """Test that all tools have proper schemas"""
         print("🔍 Testing Tool Schema Validation")
         print("-" * 40)
 
-        tools_response = self.send_request("tools/list")
-        if not tools_response.get("result"):
+        tools_response = await self.send_request("tools/list")
+        if not tools_response.result:
             print("❌ Failed to get tools list")
             return False
 
-        tools = tools_response["result"]["tools"]
+        tools = tools_response.result["tools"]
 
         for tool in tools:
             print(f"Testing {tool['name']}...")
@@ -97,24 +205,35 @@ class MCPToolTester:
                 print(f"  ❌ inputSchema missing 'properties'")
                 return False
 
+            if Draft7Validator is not None:
+                try:
+                    self._get_validator(tool['name'], schema)
+                except SchemaError as e:
+                    print(f"  ❌ inputSchema is not valid JSON Schema: {e.message}")
+                    return False
+
             print(f"  ✅ Schema valid")
 
         print("✅ All tool schemas valid\n")
         return True
 
-    def test_tool_parameter_validation(self):
+    async def test_tool_parameter_validation(self):
         """Test parameter validation for tools"""
         print("🔧 Testing Parameter Validation")
         print("-" * 40)
 
         # Test missing required parameters
         print("Testing missing required parameters...")
-        response = self.send_request("tools/call", {
-            "name": "rabbitize_start_session",
-            "arguments": {}  # Missing required 'url'
-        })
+        response, argument_errors = await self.call_tool(
+            "rabbitize_start_session",
+            {}  # Missing required 'url'
+        )
+
+        if Draft7Validator is not None and not argument_errors:
+            print("  ❌ inputSchema should reject missing required parameter")
+            return False
 
-        if response.get("error") and response["error"]["code"] == -32602:
+        if response.error and response.error["code"] == -32602:
             print("  ✅ Properly rejected missing required parameter")
         else:
             print(f"  ❌ Should reject missing required parameter: {response}")
@@ -122,12 +241,9 @@ class MCPToolTester:
 
         # Test invalid tool name
         print("Testing invalid tool name...")
-        response = self.send_request("tools/call", {
-            "name": "nonexistent_tool",
-            "arguments": {}
-        })
+        response, _ = await self.call_tool("nonexistent_tool", {})
 
-        if response.get("error") and response["error"]["code"] == -32601:
+        if response.error and response.error["code"] == -32601:
             print("  ✅ Properly rejected invalid tool name")
         else:
             print(f"  ❌ Should reject invalid tool name: {response}")
@@ -136,23 +252,23 @@ class MCPToolTester:
         print("✅ Parameter validation working correctly\n")
         return True
 
-    def test_tool_response_structure(self):
+    async def test_tool_response_structure(self):
         """Test that tool responses have proper structure"""
         print("📋 Testing Response Structure")
         print("-" * 40)
 
         # Test a simple tool first (status)
         print("Testing rabbitize_status response...")
-        response = self.send_request("tools/call", {
-            "name": "rabbitize_status",
-            "arguments": {}
-        })
+        response, argument_errors = await self.call_tool("rabbitize_status", {})
+        if argument_errors:
+            print(f"  ❌ Arguments don't match inputSchema: {argument_errors}")
+            return False
 
-        if not response.get("result"):
+        if not response.result:
             print(f"  ❌ No result in response: {response}")
             return False
 
-        result = response["result"]
+        result = response.result
 
         # Check for 'content' field
         if "content" not in result:
@@ -185,14 +301,14 @@ class MCPToolTester:
         print("✅ Response structure testing complete\n")
         return True
 
-    def test_performance(self):
+    async def test_performance(self):
         """Test response times for tools"""
         print("⏱️  Testing Performance")
         print("-" * 40)
 
         # Test status tool performance (should be fast)
         start_time = time.time()
-        response = self.send_request("tools/call", {
+        response = await self.send_request("tools/call", {
             "name": "rabbitize_status",
             "arguments": {}
         })
@@ -210,38 +326,53 @@ class MCPToolTester:
         print("✅ Performance testing complete\n")
         return True
 
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all testing suites"""
         print("🚀 Starting Comprehensive MCP Tool Testing")
         print("=" * 50)
 
-        if not self.start_server():
-            print("❌ Failed to start server")
+        try:
+            started = await self.start_server()
+        except ConnectionError as e:
+            print(f"❌ Failed to start server: {e}")
+            started = False
+        if not started:
+            await self.stop_server()
             return False
 
         try:
+            # These suites only probe the server without changing its state, so they
+            # run concurrently over the pipelined connection
             tests = [
                 self.test_tool_schema_validation,
                 self.test_tool_parameter_validation,
-                self.test_tool_response_structure,
-                self.test_performance
+                self.test_tool_response_structure
             ]
 
-            for test in tests:
-                if not test():
+            results = await asyncio.gather(*(test() for test in tests), return_exceptions=True)
+            for test, result in zip(tests, results):
+                if isinstance(result, Exception):
+                    print(f"❌ Test errored: {test.__name__}: {result}")
+                    return False
+                if not result:
                     print(f"❌ Test failed: {test.__name__}")
                     return False
 
+            # Performance runs on its own so it measures uncontended latency
+            if not await self.test_performance():
+                print("❌ Test failed: test_performance")
+                return False
+
             print("🎉 All tests passed!")
             return True
 
         finally:
-            self.stop_server()
+            await self.stop_server()
 
 def main():
     """Run the tool testing framework"""
     tester = MCPToolTester([sys.executable, "rabbitize_mcp_server_simple.py"])
-    success = tester.run_all_tests()
+    success = asyncio.run(tester.run_all_tests())
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -8,22 +8,32 @@ automatically managing session lifecycle and returning screenshots as base64 ima
 
 import asyncio
 import json
-import base64
-import requests
+import binascii
 import time
 import os
 import logging
-import uuid
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
-import aiohttp
+import httpx
 import aiofiles
-from urllib.parse import urljoin
 import signal
 import sys
 import threading
 from datetime import datetime
 
+# Optional: faster JSON formatting when orjson is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: HTTP/2 support for httpx (used when Rabbitize is served over TLS)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # MCP imports
 try:
     from mcp import McpServer, Tool, TextContent, ImageContent
@@ -39,28 +49,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Screenshot readiness polling (replaces fixed post-command sleeps)
+SCREENSHOT_POLL_INTERVAL = 0.01
+SCREENSHOT_WAIT_TIMEOUT = 3.0
+# Screenshot read size; a multiple of 3 so each chunk base64-encodes without padding
+SCREENSHOT_READ_CHUNK = 48 * 1024
+
+def _format_json(data: Any) -> str:
+    """Pretty-print a Rabbitize result for tool response text"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Keep-alive HTTP client for talking to the Rabbitize REST API.
+
+    HTTP/2 is negotiated over TLS when h2 is installed, letting concurrent tool calls
+    multiplex over one connection; plain http:// URLs stay on pooled HTTP/1.1.
+    """
+    return httpx.AsyncClient(
+        headers={
+            'Content-Type': 'application/json',
+            'User-Agent': 'RabbitizeMCP/1.0'
+        },
+        http2=HTTP2_AVAILABLE,
+        timeout=60,
+        limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60)
+    )
+
+async def _read_file_b64(path: str) -> str:
+    """Read a file as base64, encoding chunk by chunk instead of holding the whole raw file"""
+    encoded = bytearray()
+    async with aiofiles.open(path, 'rb') as f:
+        while chunk := await f.read(SCREENSHOT_READ_CHUNK):
+            encoded += binascii.b2a_base64(chunk, newline=False)
+    return encoded.decode('ascii')
+
 class RabbitizeSession:
     """Manages a Rabbitize session with automatic lifecycle management"""
 
-    def __init__(self, base_url: str = "http://localhost:3000", client_id: str = None, test_id: str = None):
+    def __init__(self, base_url: str = "http://localhost:3000", client_id: str = None, test_id: str = None,
+                 http: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url
-        self.client_id = client_id or f"mcp-client-{uuid.uuid4().hex[:8]}"
-        self.test_id = test_id or f"mcp-test-{uuid.uuid4().hex[:8]}"
+        self.client_id = client_id or f"mcp-client-{os.urandom(4).hex()}"
+        self.test_id = test_id or f"mcp-test-{os.urandom(4).hex()}"
+        # Endpoint URLs are fixed for the session's lifetime, so build them once
+        root = base_url.rstrip('/')
+        self._ep = {name: f"{root}/{name}" for name in ('start', 'execute', 'end')}
         self.session_id = None
         self.is_active = False
         self.command_counter = 0
+        # Incremented on every change to the fields reported by get_session_status
+        self.status_version = 0
         self.session_data = {}
         self.last_screenshot_path = None
+        # Fallback screenshots/ directory scan, keyed on the directory's mtime and the newest
+        # file's own mtime (rewriting a file in place leaves the directory's mtime alone);
+        # dropped whenever a command runs
+        self._screenshot_dir_cache = {"path": None, "mtime": 0, "latest": None, "latest_mtime": 0}
 
-        # HTTP session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'RabbitizeMCP/1.0'
-        })
+        # Async HTTP client for connection pooling; either shared by the server or
+        # created lazily inside the event loop (and then owned by this session)
+        self.http: Optional[httpx.AsyncClient] = http
+        self._owns_http = False
 
         logger.info(f"Initialized Rabbitize session manager for {self.client_id}/{self.test_id}")
 
+    async def _ensure_http(self) -> httpx.AsyncClient:
+        """Create the keep-alive HTTP client on first use, unless a shared one was provided"""
+        if self.http is None or self.http.is_closed:
+            self.http = _create_http_client()
+            self._owns_http = True
+        return self.http
+
+    def _latest_screenshot_path(self) -> str:
+        """Path of the latest.jpg written by Rabbitize for this session"""
+        return f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/latest.jpg"
+
+    def _screenshot_mtime_ns(self) -> int:
+        """Current mtime of latest.jpg, or 0 if it has not been written yet"""
+        try:
+            return os.stat(self._latest_screenshot_path()).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    async def _wait_for_screenshot(self, prev_mtime_ns: int, timeout: float = SCREENSHOT_WAIT_TIMEOUT):
+        """Wait until latest.jpg is newer than prev_mtime_ns (and non-empty), or the timeout expires"""
+        path = self._latest_screenshot_path()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                st = await asyncio.to_thread(os.stat, path)
+                if st.st_mtime_ns > prev_mtime_ns and st.st_size > 0:
+                    return
+            except FileNotFoundError:
+                pass
+            await asyncio.sleep(SCREENSHOT_POLL_INTERVAL)
+        logger.debug(f"Timed out after {timeout}s waiting for a new screenshot")
+
     async def start_session(self, url: str) -> Dict[str, Any]:
         """Start a new Rabbitize session"""
         try:
@@ -71,22 +157,20 @@ class RabbitizeSession:
             }
 
             logger.info(f"Starting Rabbitize session for URL: {url}")
-            response = self.session.post(
-                urljoin(self.base_url, "/start"),
-                json=payload,
-                timeout=30
-            )
+            http = await self._ensure_http()
+            response = await http.post(self._ep['start'], json=payload, timeout=30)
 
             if response.status_code == 200:
                 result = response.json()
                 self.session_id = result.get('sessionId')
                 self.is_active = True
                 self.command_counter = 0
+                self.status_version += 1
 
                 logger.info(f"Session started successfully: {self.session_id}")
 
-                # Wait a moment for initial screenshot
-                await asyncio.sleep(2)
+                # Wait for the initial screenshot to land
+                await self._wait_for_screenshot(0)
 
                 # Get initial screenshot
                 screenshot_b64 = await self.get_latest_screenshot()
@@ -116,8 +200,8 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
-    async def execute_command(self, command: List[str]) -> Dict[str, Any]:
-        """Execute a command in the active session"""
+    async def execute_command(self, command: List[str], return_screenshot: bool = True) -> Dict[str, Any]:
+        """Execute a command in the active session, optionally skipping the screenshot capture"""
         if not self.is_active:
             return {
                 "success": False,
@@ -125,24 +209,22 @@ class RabbitizeSession:
             }
 
         try:
-            payload = {"command": command}
-
             logger.info(f"Executing command: {command}")
-            response = self.session.post(
-                urljoin(self.base_url, "/execute"),
-                json=payload,
-                timeout=60
-            )
+            if return_screenshot:
+                prev_mtime_ns = await asyncio.to_thread(self._screenshot_mtime_ns)
+            status, result = await self._post_execute(command)
 
-            if response.status_code == 200:
-                result = response.json()
+            if status == 200:
                 self.command_counter += 1
+                self.status_version += 1
 
-                # Wait a moment for screenshot to be taken
-                await asyncio.sleep(1)
+                screenshot_b64 = None
+                if return_screenshot:
+                    # Wait for the post-command screenshot to be written
+                    await self._wait_for_screenshot(prev_mtime_ns)
 
-                # Get the updated screenshot
-                screenshot_b64 = await self.get_latest_screenshot()
+                    # Get the updated screenshot
+                    screenshot_b64 = await self.get_latest_screenshot()
 
                 return {
                     "success": True,
@@ -153,7 +235,7 @@ class RabbitizeSession:
                     "message": f"Command executed successfully: {' '.join(map(str, command))}"
                 }
             else:
-                error_msg = f"Failed to execute command: {response.status_code} - {response.text}"
+                error_msg = f"Failed to execute command: {status} - {result}"
                 logger.error(error_msg)
                 return {
                     "success": False,
@@ -168,6 +250,84 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
+    async def execute_batch(self, commands: List[List[str]], stop_on_error: bool = True,
+                            capture_intermediate: bool = False) -> Dict[str, Any]:
+        """Execute several commands in order, returning one consolidated result.
+
+        Commands run sequentially against the single browser session. Unless
+        capture_intermediate is set, only one screenshot is taken, after the last command.
+        """
+        if not self.is_active:
+            return {
+                "success": False,
+                "error": "No active session. Please start a session first."
+            }
+
+        steps = []
+        screenshots = []
+        try:
+            prev_mtime_ns = await asyncio.to_thread(self._screenshot_mtime_ns)
+
+            for command in commands:
+                logger.info(f"Executing batch command {len(steps) + 1}/{len(commands)}: {command}")
+                status, result = await self._post_execute(command)
+
+                if status != 200:
+                    error_msg = f"Failed to execute command: {status} - {result}"
+                    logger.error(error_msg)
+                    steps.append({"command": command, "success": False, "error": error_msg})
+                    if stop_on_error:
+                        break
+                    continue
+
+                self.command_counter += 1
+                self.status_version += 1
+                steps.append({
+                    "command": command,
+                    "success": True,
+                    "commandIndex": self.command_counter,
+                    "result": result
+                })
+
+                if capture_intermediate:
+                    await self._wait_for_screenshot(prev_mtime_ns)
+                    prev_mtime_ns = await asyncio.to_thread(self._screenshot_mtime_ns)
+                    screenshots.append(await self.get_latest_screenshot())
+
+            if not capture_intermediate:
+                await self._wait_for_screenshot(prev_mtime_ns)
+                screenshots.append(await self.get_latest_screenshot())
+
+            succeeded = sum(1 for step in steps if step["success"])
+            return {
+                "success": succeeded == len(commands),
+                "steps": steps,
+                "commandsRequested": len(commands),
+                "commandsSucceeded": succeeded,
+                "screenshots": [shot for shot in screenshots if shot],
+                "screenshot": screenshots[-1] if screenshots else None,
+                "message": f"Executed {succeeded}/{len(commands)} commands"
+            }
+
+        except Exception as e:
+            error_msg = f"Error executing batch: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "steps": steps,
+                "error": error_msg
+            }
+
+    async def _post_execute(self, command: List[str]):
+        """POST a command to /execute, returning (status, parsed JSON or error text)"""
+        # The command can write or rewrite screenshots, so rescan the directory next time
+        self._screenshot_dir_cache["path"] = None
+        http = await self._ensure_http()
+        response = await http.post(self._ep['execute'], json={"command": command}, timeout=60)
+        if response.status_code == 200:
+            return response.status_code, response.json()
+        return response.status_code, response.text
+
     async def end_session(self) -> Dict[str, Any]:
         """End the active session"""
         if not self.is_active:
@@ -178,15 +338,14 @@ class RabbitizeSession:
 
         try:
             logger.info("Ending Rabbitize session")
-            response = self.session.post(
-                urljoin(self.base_url, "/end"),
-                timeout=30
-            )
+            http = await self._ensure_http()
+            response = await http.post(self._ep['end'], timeout=30)
 
             if response.status_code == 200:
                 result = response.json()
                 self.is_active = False
                 self.session_id = None
+                self.status_version += 1
 
                 logger.info("Session ended successfully")
                 return {
@@ -211,26 +370,49 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
+    def _find_latest_screenshot_file(self, alt_path: str) -> Optional[str]:
+        """Newest .jpg in the screenshots directory, rescanned only when the directory changes"""
+        try:
+            dir_mtime_ns = os.stat(alt_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cache = self._screenshot_dir_cache
+        if cache["path"] == alt_path and cache["mtime"] == dir_mtime_ns:
+            if cache["latest"] is None:
+                return None
+            try:
+                if os.stat(cache["latest"]).st_mtime_ns == cache["latest_mtime"]:
+                    return cache["latest"]
+            except FileNotFoundError:
+                pass
+
+        with os.scandir(alt_path) as entries:
+            newest = max(
+                (entry for entry in entries if entry.name.endswith('.jpg')),
+                key=lambda entry: entry.stat().st_mtime_ns,
+                default=None
+            )
+        latest = newest.path if newest else None
+        latest_mtime = newest.stat().st_mtime_ns if newest else 0
+        self._screenshot_dir_cache = {"path": alt_path, "mtime": dir_mtime_ns, "latest": latest, "latest_mtime": latest_mtime}
+        return latest
+
     async def get_latest_screenshot(self) -> Optional[str]:
         """Get the latest screenshot as base64"""
         try:
-            # Try to get the latest screenshot from the session
-            screenshot_path = f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/latest.jpg"
-
-            if os.path.exists(screenshot_path):
-                async with aiofiles.open(screenshot_path, 'rb') as f:
-                    image_data = await f.read()
-                    return base64.b64encode(image_data).decode('utf-8')
+            # Try to get the latest screenshot from the session; opening directly
+            # avoids a separate exists() probe
+            try:
+                return await _read_file_b64(self._latest_screenshot_path())
+            except FileNotFoundError:
+                pass
 
             # Fallback: try to get from a different path structure
             alt_path = f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/screenshots"
-            if os.path.exists(alt_path):
-                screenshots = sorted([f for f in os.listdir(alt_path) if f.endswith('.jpg')])
-                if screenshots:
-                    latest_screenshot = os.path.join(alt_path, screenshots[-1])
-                    async with aiofiles.open(latest_screenshot, 'rb') as f:
-                        image_data = await f.read()
-                        return base64.b64encode(image_data).decode('utf-8')
+            latest_screenshot = await asyncio.to_thread(self._find_latest_screenshot_file, alt_path)
+            if latest_screenshot:
+                return await _read_file_b64(latest_screenshot)
 
             logger.warning("No screenshot found")
             return None
@@ -239,7 +421,7 @@ class RabbitizeSession:
             logger.error(f"Error getting screenshot: {str(e)}")
             return None
 
-    async def get_session_status(self) -> Dict[str, Any]:
+    def get_session_status(self) -> Dict[str, Any]:
         """Get current session status"""
         return {
             "isActive": self.is_active,
@@ -250,18 +432,57 @@ class RabbitizeSession:
             "baseUrl": self.base_url
         }
 
-    def cleanup(self):
+    async def cleanup(self):
         """Cleanup resources"""
-        if self.session:
-            self.session.close()
+        if self._owns_http and self.http and not self.http.is_closed:
+            await self.http.aclose()
         logger.info("Session cleanup completed")
 
+# Tool response text templates, bound once at import
+_START_SUCCESS_TEXT = (
+    "Session started successfully!\n\n"
+    "Session ID: {sessionId}\n"
+    "URL: {url}\n"
+    "Client ID: {clientId}\n"
+    "Test ID: {testId}\n\n"
+    "Initial screenshot captured and displayed below."
+).format_map
+_STATUS_TEXT = (
+    "Rabbitize Session Status:\n\n"
+    "Active: {isActive}\n"
+    "Session ID: {sessionId}\n"
+    "Client ID: {clientId}\n"
+    "Test ID: {testId}\n"
+    "Commands executed: {commandCounter}\n"
+    "Base URL: {baseUrl}"
+).format_map
+
+# Optional tool arguments selecting which Rabbitize session a call applies to
+SESSION_KEY_PROPERTIES = {
+    "clientId": {
+        "type": "string",
+        "description": "Client ID of the session to use (defaults to this server's session)"
+    },
+    "testId": {
+        "type": "string",
+        "description": "Test ID of the session to use (defaults to this server's session)"
+    }
+}
+
 class RabbitizeMCPServer:
     """MCP Server for Rabbitize integration"""
 
     def __init__(self, rabbitize_url: str = "http://localhost:3000"):
         self.rabbitize_url = rabbitize_url
+        # Default session, used when a tool call does not name a clientId/testId
         self.rabbitize_session = RabbitizeSession(rabbitize_url)
+        self.sessions: Dict[Tuple[str, str], RabbitizeSession] = {
+            (self.rabbitize_session.client_id, self.rabbitize_session.test_id): self.rabbitize_session
+        }
+        # Formatted status text per session, keyed by (clientId, testId) -> (status_version, text)
+        self._status_text_cache: Dict[Tuple[str, str], Tuple[int, str]] = {}
+        # One connection pool shared by every session (created inside the event loop)
+        self.http: Optional[httpx.AsyncClient] = None
         self.server = McpServer("rabbitize-mcp")
 
         # Register tools
@@ -273,6 +494,26 @@ class RabbitizeMCPServer:
 
         logger.info(f"Rabbitize MCP Server initialized with Rabbitize at {rabbitize_url}")
 
+    def _get_session(self, client_id: Optional[str] = None, test_id: Optional[str] = None) -> RabbitizeSession:
+        """Look up the session for a clientId/testId pair, creating it on first use"""
+        if self.http is None or self.http.is_closed:
+            self.http = _create_http_client()
+
+        key = (client_id or self.rabbitize_session.client_id, test_id or self.rabbitize_session.test_id)
+        session = self.sessions.get(key)
+        if session is None:
+            session = RabbitizeSession(self.rabbitize_url, *key, http=self.http)
+            self.sessions[key] = session
+        elif not session._owns_http:
+            session.http = self.http
+        return session
+
+    async def _end_all_sessions(self):
+        """End every active session concurrently"""
+        active = [session for session in self.sessions.values() if session.is_active]
+        if active:
+            await asyncio.gather(*(session.end_session() for session in active), return_exceptions=True)
+
     def _register_tools(self):
         """Register MCP tools"""
 
@@ -285,25 +526,22 @@ class RabbitizeMCPServer:
                     "url": {
                         "type": "string",
                         "description": "The URL to navigate to when starting the session"
-                    }
+                    },
+                    **SESSION_KEY_PROPERTIES
                 },
                 "required": ["url"]
             }
         )
-        async def start_session(url: str):
+        async def start_session(url: str, clientId: Optional[str] = None, testId: Optional[str] = None):
             """Start a new Rabbitize session"""
-            result = await self.rabbitize_session.start_session(url)
+            session = self._get_session(clientId, testId)
+            result = await session.start_session(url)
 
             if result["success"] and result.get("screenshot"):
                 return [
                     TextContent(
                         type="text",
-                        text=f"Session started successfully!\n\n"
-                             f"Session ID: {result.get('sessionId')}\n"
-                             f"URL: {result.get('url')}\n"
-                             f"Client ID: {result.get('clientId')}\n"
-                             f"Test ID: {result.get('testId')}\n\n"
-                             f"Initial screenshot captured and displayed below."
+                        text=_START_SUCCESS_TEXT(result)
                     ),
                     ImageContent(
                         type="image",
@@ -327,23 +565,38 @@ class RabbitizeMCPServer:
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "The command to execute as an array of strings (e.g., [':click'] or [':move-mouse', ':to', '100', '200'])"
-                    }
+                    },
+                    "returnScreenshot": {
+                        "type": "boolean",
+                        "default": True,
+                        "description": "Capture and return a screenshot after the command (default: true). Set to false for intermediate steps such as mouse moves."
+                    },
+                    **SESSION_KEY_PROPERTIES
                 },
                 "required": ["command"]
             }
         )
-        async def execute_command(command: List[str]):
+        async def execute_command(command: List[str], returnScreenshot: bool = True, clientId: Optional[str] = None, testId: Optional[str] = None):
             """Execute a command in the active session"""
-            result = await self.rabbitize_session.execute_command(command)
+            session = self._get_session(clientId, testId)
+            result = await session.execute_command(command, return_screenshot=returnScreenshot)
 
-            if result["success"] and result.get("screenshot"):
+            if result["success"] and not returnScreenshot:
+                return [TextContent(
+                    type="text",
+                    text=f"Command executed successfully!\n\n"
+                         f"Command: {' '.join(result['command'])}\n"
+                         f"Command Index: {result.get('commandIndex')}\n"
+                         f"Result: {_format_json(result.get('result', {}))}"
+                )]
+            elif result["success"] and result.get("screenshot"):
                 return [
                     TextContent(
                         type="text",
                         text=f"Command executed successfully!\n\n"
                              f"Command: {' '.join(result['command'])}\n"
                              f"Command Index: {result.get('commandIndex')}\n"
-                             f"Result: {json.dumps(result.get('result', {}), indent=2)}\n\n"
+                             f"Result: {_format_json(result.get('result', {}))}\n\n"
                              f"Updated screenshot displayed below."
                     ),
                     ImageContent(
@@ -358,24 +611,88 @@ class RabbitizeMCPServer:
                     text=f"Failed to execute command: {result.get('error', 'Unknown error')}"
                 )]
 
+        @self.server.tool(
+            name="rabbitize_batch_execute",
+            description="Execute several commands in order in the active Rabbitize session and return one summary with a final screenshot",
+            parameters={
+                "type": "object",
+                "properties": {
+                    "commands": {
+                        "type": "array",
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "string"}
+                        },
+                        "description": "Commands to execute in order, each an array of strings (e.g., [[':move-mouse', ':to', '100', '200'], [':click']])"
+                    },
+                    "stopOnError": {
+                        "type": "boolean",
+                        "default": True,
+                        "description": "Stop at the first failing command (default: true)"
+                    },
+                    "captureIntermediate": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Return a screenshot after every command instead of only the last (default: false)"
+                    },
+                    **SESSION_KEY_PROPERTIES
+                },
+                "required": ["commands"]
+            }
+        )
+        async def batch_execute(commands: List[List[str]], stopOnError: bool = True, captureIntermediate: bool = False, clientId: Optional[str] = None, testId: Optional[str] = None):
+            """Execute a batch of commands in the active session"""
+            session = self._get_session(clientId, testId)
+            result = await session.execute_batch(commands, stopOnError, captureIntermediate)
+
+            if "steps" not in result:
+                return [TextContent(
+                    type="text",
+                    text=f"Failed to execute batch: {result.get('error', 'Unknown error')}"
+                )]
+
+            lines = []
+            for i, step in enumerate(result["steps"], 1):
+                command_text = ' '.join(map(str, step['command']))
+                if step["success"]:
+                    lines.append(f"{i}. ✓ {command_text}")
+                else:
+                    lines.append(f"{i}. ✗ {command_text} - {step['error']}")
+
+            summary = result.get("message") or f"Batch failed: {result.get('error', 'Unknown error')}"
+            content = [TextContent(
+                type="text",
+                text=f"{summary}\n\n" + "\n".join(lines)
+            )]
+            for screenshot in result.get("screenshots", []):
+                content.append(ImageContent(
+                    type="image",
+                    data=screenshot,
+                    mimeType="image/jpeg"
+                ))
+            return content
+
         @self.server.tool(
             name="rabbitize_get_screenshot",
             description="Get the latest screenshot from the active Rabbitize session",
             parameters={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    **SESSION_KEY_PROPERTIES
+                },
                 "required": []
             }
         )
-        async def get_screenshot():
+        async def get_screenshot(clientId: Optional[str] = None, testId: Optional[str] = None):
             """Get the latest screenshot"""
-            if not self.rabbitize_session.is_active:
+            session = self._get_session(clientId, testId)
+            if not session.is_active:
                 return [TextContent(
                     type="text",
                     text="No active session. Please start a session first."
                 )]
 
-            screenshot_b64 = await self.rabbitize_session.get_latest_screenshot()
+            screenshot_b64 = await session.get_latest_screenshot()
 
             if screenshot_b64:
                 return [
@@ -400,20 +717,23 @@ class RabbitizeMCPServer:
             description="End the current Rabbitize session",
             parameters={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    **SESSION_KEY_PROPERTIES
+                },
                 "required": []
             }
         )
-        async def end_session():
+        async def end_session(clientId: Optional[str] = None, testId: Optional[str] = None):
             """End the current session"""
-            result = await self.rabbitize_session.end_session()
+            session = self._get_session(clientId, testId)
+            result = await session.end_session()
 
             if result["success"]:
                 return [TextContent(
                     type="text",
                     text=f"Session ended successfully!\n\n"
                          f"Commands executed: {result.get('commandsExecuted', 0)}\n"
-                         f"Result: {json.dumps(result.get('result', {}), indent=2)}"
+                         f"Result: {_format_json(result.get('result', {}))}"
                 )]
             else:
                 return [TextContent(
@@ -426,35 +746,34 @@ class RabbitizeMCPServer:
             description="Get the current status of the Rabbitize session",
             parameters={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    **SESSION_KEY_PROPERTIES
+                },
                 "required": []
             }
         )
-        async def get_status():
+        async def get_status(clientId: Optional[str] = None, testId: Optional[str] = None):
             """Get session status"""
-            status = await self.rabbitize_session.get_session_status()
+            session = self._get_session(clientId, testId)
+            key = (session.client_id, session.test_id)
+            cached = self._status_text_cache.get(key)
+            if cached is None or cached[0] != session.status_version:
+                cached = (session.status_version, _STATUS_TEXT(session.get_session_status()))
+                self._status_text_cache[key] = cached
             return [TextContent(
                 type="text",
-                text=f"Rabbitize Session Status:\n\n"
-                     f"Active: {status['isActive']}\n"
-                     f"Session ID: {status.get('sessionId', 'None')}\n"
-                     f"Client ID: {status['clientId']}\n"
-                     f"Test ID: {status['testId']}\n"
-                     f"Commands executed: {status['commandCounter']}\n"
-                     f"Base URL: {status['baseUrl']}"
+                text=cached[1]
             )]
 
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
 
-        # End the session if active
-        if self.rabbitize_session.is_active:
-            asyncio.create_task(self.rabbitize_session.end_session())
-
-        # Cleanup
-        self.rabbitize_session.cleanup()
+        # End every active session
+        asyncio.create_task(self._end_all_sessions())
 
+        # Cleanup of the HTTP session happens in run()'s finally block,
+        # which still executes as SystemExit unwinds the event loop
         sys.exit(0)
 
     async def run(self):
@@ -466,7 +785,10 @@ class RabbitizeMCPServer:
             logger.error(f"Server error: {str(e)}")
             raise
         finally:
-            self.rabbitize_session.cleanup()
+            for session in self.sessions.values():
+                await session.cleanup()
+            if self.http and not self.http.is_closed:
+                await self.http.aclose()
 
 def main():
     """Main entry point"""
@@ -8,19 +8,29 @@ implementing the MCP protocol directly over stdin/stdout using JSON-RPC.
 
 import asyncio
 import json
-import base64
-import requests
+import hashlib
+import httpx
 import time
 import os
 import logging
-import uuid
 import sys
 import signal
-from typing import Dict, Any, Optional, List, Union
+import stat
+from typing import Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
-from urllib.parse import urljoin
 from datetime import datetime
-import aiofiles
+
+# Optional: faster JSON parsing and serialization when orjson is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: SIMD base64 for screenshot encoding, drop-in for the stdlib module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 # Configure logging to stderr so it doesn't interfere with JSON-RPC on stdout
 logging.basicConfig(
@@ -30,6 +40,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Screenshot readiness polling (replaces fixed post-command sleeps)
+SCREENSHOT_POLL_INTERVAL = 0.02
+DEFAULT_SCREENSHOT_TIMEOUT = 1.5
+# How screenshots are handed to the client: base64 image content, or a file:// resource
+# URI for clients on the same host that can read the file themselves
+SCREENSHOT_MODES = ("inline", "uri")
+# Longest JSON-RPC request line accepted on stdin
+MAX_REQUEST_LINE = 16 * 1024 * 1024
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON-RPC request line; raises json.JSONDecodeError on bad input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_default(obj: Any) -> Any:
+    """Serialize base64 screenshot bytes as a JSON string.
+
+    Base64 is ASCII with no characters JSON needs to escape, so with orjson the
+    bytes are spliced in as-is and never become a Python str.
+    """
+    if isinstance(obj, (bytes, bytearray)):
+        # orjson.Fragment needs orjson >= 3.9
+        if orjson is not None and hasattr(orjson, 'Fragment'):
+            return orjson.Fragment(b'"' + obj + b'"')
+        return obj.decode('ascii')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a JSON-RPC message to compact UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
+
+def _read_file_sync(path: str) -> bytes:
+    """Read a whole file; meant to run in a worker thread so open, read and close share one hop"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+async def _encode_b64(data: bytes) -> bytes:
+    """Base64-encode image bytes for a JSON-RPC response.
+
+    Runs in a worker thread so a large screenshot doesn't stall other requests;
+    the encoder releases the GIL while it works. The result stays as bytes and
+    is written out by _json_dumps without decoding.
+    """
+    return await asyncio.to_thread(base64.b64encode, data)
+
 class MCPError(Exception):
     """MCP specific error"""
     def __init__(self, code: int, message: str, data: Any = None):
@@ -41,37 +99,73 @@ class MCPError(Exception):
 class RabbitizeSession:
     """Manages a Rabbitize session with automatic lifecycle management"""
 
-    def __init__(self, base_url: str = "http://localhost:3000", client_id: str = None, test_id: str = None):
+    def __init__(self, base_url: str = "http://localhost:3000", client_id: str = None, test_id: str = None,
+                 screenshot_timeout: float = DEFAULT_SCREENSHOT_TIMEOUT, screenshot_mode: str = "inline"):
         self.base_url = base_url
-        self.client_id = client_id or f"mcp-client-{uuid.uuid4().hex[:8]}"
-        self.test_id = test_id or f"mcp-test-{uuid.uuid4().hex[:8]}"
+        self.screenshot_timeout = screenshot_timeout
+        self.screenshot_mode = screenshot_mode
+        # Endpoint URLs are fixed for the session's lifetime, so build them once
+        root = base_url.rstrip('/')
+        self._ep = {name: f"{root}/{name}" for name in ('start', 'execute', 'end')}
+        self.client_id = client_id or f"mcp-client-{os.urandom(4).hex()}"
+        self.test_id = test_id or f"mcp-test-{os.urandom(4).hex()}"
         self.session_id = None
         self.is_active = False
         self.command_counter = 0
         self.session_data = {}
         self.last_screenshot_path = None
-
-        # HTTP session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'RabbitizeMCP/1.0'
-        })
+        # Digest of the last screenshot sent to the client, to avoid resending identical images
+        self._last_screenshot_hash: Optional[bytes] = None
+        # latest.jpg path once it has been read successfully for the current session
+        self._screenshot_path_cache: Optional[str] = None
+        # Base64 of the last screenshot read, keyed on latest.jpg's (path, mtime_ns, size)
+        self._b64_cache_key: Optional[Tuple[str, int, int]] = None
+        self._b64_cache: Optional[bytes] = None
+
+        # Async HTTP client; keep-alive connections are reused across all calls
+        self._client = httpx.AsyncClient(
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'RabbitizeMCP/1.0'
+            },
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30)
+        )
 
         logger.info(f"Initialized Rabbitize session manager for {self.client_id}/{self.test_id}")
 
-    def start_session(self, url: str) -> Dict[str, Any]:
+    def _latest_screenshot_path(self) -> str:
+        """Path of the latest.jpg written by Rabbitize for this session"""
+        return f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/latest.jpg"
+
+    def _screenshot_mtime_ns(self) -> int:
+        """Current mtime of latest.jpg, or 0 if it has not been written yet (blocking; run via to_thread)"""
+        try:
+            return os.stat(self._latest_screenshot_path()).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    async def _wait_for_screenshot(self, prev_mtime_ns: int):
+        """Wait until latest.jpg is newer than prev_mtime_ns, or screenshot_timeout expires"""
+        deadline = time.monotonic() + self.screenshot_timeout
+        while time.monotonic() < deadline:
+            if await asyncio.to_thread(self._screenshot_mtime_ns) > prev_mtime_ns:
+                return
+            await asyncio.sleep(SCREENSHOT_POLL_INTERVAL)
+        logger.debug(f"Timed out after {self.screenshot_timeout}s waiting for a new screenshot")
+
+    async def start_session(self, url: str) -> Dict[str, Any]:
         """Start a new Rabbitize session"""
         try:
             payload = {
                 "url": url,
                 "clientId": self.client_id,
-                "testId": self.test_id
+                "testId": self.test_id,
+                "includeScreenshot": self.screenshot_mode == "inline"
             }
 
             logger.info(f"Starting Rabbitize session for URL: {url}")
-            response = self.session.post(
-                urljoin(self.base_url, "/start"),
+            response = await self._client.post(
+                self._ep['start'],
                 json=payload,
                 timeout=30
             )
@@ -79,16 +173,25 @@ class RabbitizeSession:
             if response.status_code == 200:
                 result = response.json()
                 self.session_id = result.get('sessionId')
+                self._screenshot_path_cache = None
                 self.is_active = True
                 self.command_counter = 0
+                self._last_screenshot_hash = None
+                self._b64_cache_key = None
+                self._b64_cache = None
 
                 logger.info(f"Session started successfully: {self.session_id}")
 
-                # Wait a moment for initial screenshot
-                time.sleep(2)
-
-                # Get initial screenshot
-                screenshot_b64 = self.get_latest_screenshot()
+                # Rabbitize returns the initial screenshot inline when asked to;
+                # otherwise wait for it to land on disk
+                screenshot_b64 = result.get('screenshotB64')
+                screenshot_path = None
+                if not screenshot_b64:
+                    await self._wait_for_screenshot(0)
+                    if self.screenshot_mode == "uri":
+                        screenshot_path = await self.get_latest_screenshot_path()
+                    else:
+                        screenshot_b64 = await self.get_latest_screenshot()
 
                 return {
                     "success": True,
@@ -97,6 +200,7 @@ class RabbitizeSession:
                     "testId": self.test_id,
                     "url": url,
                     "screenshot": screenshot_b64,
+                    "screenshotPath": screenshot_path,
                     "message": f"Session started successfully at {url}"
                 }
             else:
@@ -115,7 +219,7 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
-    def execute_command(self, command: List[str]) -> Dict[str, Any]:
+    async def execute_command(self, command: List[str]) -> Dict[str, Any]:
         """Execute a command in the active session"""
         if not self.is_active:
             return {
@@ -127,8 +231,9 @@ class RabbitizeSession:
             payload = {"command": command}
 
             logger.info(f"Executing command: {command}")
-            response = self.session.post(
-                urljoin(self.base_url, "/execute"),
+            prev_mtime_ns = await asyncio.to_thread(self._screenshot_mtime_ns)
+            response = await self._client.post(
+                self._ep['execute'],
                 json=payload,
                 timeout=60
             )
@@ -137,11 +242,20 @@ class RabbitizeSession:
                 result = response.json()
                 self.command_counter += 1
 
-                # Wait a moment for screenshot to be taken
-                time.sleep(1)
+                # Wait for the post-command screenshot to be written
+                await self._wait_for_screenshot(prev_mtime_ns)
 
-                # Get the updated screenshot
-                screenshot_b64 = self.get_latest_screenshot()
+                # Get the updated screenshot, skipping the encode when it hasn't changed
+                screenshot_b64 = None
+                screenshot_path = None
+                screenshot_unchanged = False
+                if self.screenshot_mode == "uri":
+                    screenshot_path = await self.get_latest_screenshot_path()
+                else:
+                    screenshot_b64, changed = await self._load_screenshot()
+                    if screenshot_b64 is not None and not changed:
+                        screenshot_b64 = None
+                        screenshot_unchanged = True
 
                 return {
                     "success": True,
@@ -149,6 +263,9 @@ class RabbitizeSession:
                     "commandIndex": self.command_counter,
                     "result": result,
                     "screenshot": screenshot_b64,
+                    "screenshotPath": screenshot_path,
+                    "screenshotUnchanged": screenshot_unchanged,
+                    "screenshotHash": self._last_screenshot_hash.hex() if self._last_screenshot_hash else None,
                     "message": f"Command executed successfully: {' '.join(map(str, command))}"
                 }
             else:
@@ -167,7 +284,7 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
-    def end_session(self) -> Dict[str, Any]:
+    async def end_session(self) -> Dict[str, Any]:
         """End the active session"""
         if not self.is_active:
             return {
@@ -177,8 +294,8 @@ class RabbitizeSession:
 
         try:
             logger.info("Ending Rabbitize session")
-            response = self.session.post(
-                urljoin(self.base_url, "/end"),
+            response = await self._client.post(
+                self._ep['end'],
                 timeout=30
             )
 
@@ -186,6 +303,7 @@ class RabbitizeSession:
                 result = response.json()
                 self.is_active = False
                 self.session_id = None
+                self._screenshot_path_cache = None
 
                 logger.info("Session ended successfully")
                 return {
@@ -210,26 +328,38 @@ class RabbitizeSession:
                 "error": error_msg
             }
 
-    def get_latest_screenshot(self) -> Optional[str]:
-        """Get the latest screenshot as base64"""
+    @staticmethod
+    def _find_latest_screenshot_file(alt_path: str) -> Optional[str]:
+        """Newest .jpg in a screenshots directory by mtime, in a single pass"""
         try:
-            # Try to get the latest screenshot from the session
-            screenshot_path = f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/latest.jpg"
+            with os.scandir(alt_path) as it:
+                latest = max(
+                    (e for e in it if e.name.endswith('.jpg')),
+                    key=lambda e: e.stat().st_mtime_ns,
+                    default=None
+                )
+        except FileNotFoundError:
+            return None
+        return latest.path if latest else None
 
-            if os.path.exists(screenshot_path):
-                with open(screenshot_path, 'rb') as f:
-                    image_data = f.read()
-                    return base64.b64encode(image_data).decode('utf-8')
+    async def _read_latest_screenshot(self) -> Optional[bytes]:
+        """Read the raw bytes of the latest screenshot, or None if there isn't one"""
+        try:
+            # Try to get the latest screenshot from the session, opening it directly
+            # rather than probing for it first
+            screenshot_path = self._screenshot_path_cache or self._latest_screenshot_path()
+            try:
+                image_data = await asyncio.to_thread(_read_file_sync, screenshot_path)
+                self._screenshot_path_cache = screenshot_path
+                return image_data
+            except FileNotFoundError:
+                self._screenshot_path_cache = None
 
             # Fallback: try to get from a different path structure
             alt_path = f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/screenshots"
-            if os.path.exists(alt_path):
-                screenshots = sorted([f for f in os.listdir(alt_path) if f.endswith('.jpg')])
-                if screenshots:
-                    latest_screenshot = os.path.join(alt_path, screenshots[-1])
-                    with open(latest_screenshot, 'rb') as f:
-                        image_data = f.read()
-                        return base64.b64encode(image_data).decode('utf-8')
+            latest_screenshot = await asyncio.to_thread(self._find_latest_screenshot_file, alt_path)
+            if latest_screenshot:
+                return await asyncio.to_thread(_read_file_sync, latest_screenshot)
 
             logger.warning("No screenshot found")
             return None
@@ -238,6 +368,60 @@ class RabbitizeSession:
             logger.error(f"Error getting screenshot: {str(e)}")
             return None
 
+    async def get_latest_screenshot_path(self) -> Optional[str]:
+        """Absolute path of the latest screenshot on disk, without reading it"""
+        screenshot_path = self._latest_screenshot_path()
+        if not await asyncio.to_thread(os.path.exists, screenshot_path):
+            alt_path = f"rabbitize-runs/{self.client_id}/{self.test_id}/{self.session_id}/screenshots"
+            screenshot_path = await asyncio.to_thread(self._find_latest_screenshot_file, alt_path)
+            if not screenshot_path:
+                logger.warning("No screenshot found")
+                return None
+
+        self.last_screenshot_path = os.path.abspath(screenshot_path)
+        return self.last_screenshot_path
+
+    def _remember_screenshot(self, image_data: bytes) -> bool:
+        """Record the screenshot as sent; returns False if it is identical to the previous one"""
+        digest = hashlib.blake2b(image_data, digest_size=16).digest()
+        changed = digest != self._last_screenshot_hash
+        self._last_screenshot_hash = digest
+        return changed
+
+    def _screenshot_stat_key(self) -> Optional[Tuple[str, int, int]]:
+        """(path, mtime_ns, size) of latest.jpg, or None if it isn't there (blocking; run via to_thread)"""
+        screenshot_path = self._screenshot_path_cache or self._latest_screenshot_path()
+        try:
+            st = os.stat(screenshot_path)
+        except FileNotFoundError:
+            return None
+        return (screenshot_path, st.st_mtime_ns, st.st_size)
+
+    async def _load_screenshot(self) -> Tuple[Optional[bytes], bool]:
+        """Latest screenshot as base64, and whether it differs from the last one sent.
+
+        A stat of latest.jpg that matches the previous read returns the cached
+        base64 without touching the file contents.
+        """
+        key = await asyncio.to_thread(self._screenshot_stat_key)
+        if key is not None and key == self._b64_cache_key:
+            return self._b64_cache, False
+
+        image_data = await self._read_latest_screenshot()
+        if image_data is None:
+            return None, False
+
+        changed = self._remember_screenshot(image_data)
+        if changed or self._b64_cache is None:
+            self._b64_cache = await _encode_b64(image_data)
+        self._b64_cache_key = key
+        return self._b64_cache, changed
+
+    async def get_latest_screenshot(self) -> Optional[bytes]:
+        """Get the latest screenshot as base64 bytes"""
+        screenshot_b64, _ = await self._load_screenshot()
+        return screenshot_b64
+
     def get_session_status(self) -> Dict[str, Any]:
         """Get current session status"""
         return {
@@ -249,18 +433,82 @@ class RabbitizeSession:
             "baseUrl": self.base_url
         }
 
-    def cleanup(self):
+    async def cleanup(self):
         """Cleanup resources"""
-        if self.session:
-            self.session.close()
+        await self._client.aclose()
         logger.info("Session cleanup completed")
 
+# Tool response text templates, bound once at import
+_START_SUCCESS_TEXT = (
+    "Session started successfully!\n\n"
+    "Session ID: {sessionId}\n"
+    "URL: {url}\n"
+    "Client ID: {clientId}\n"
+    "Test ID: {testId}\n\n"
+    "Initial screenshot captured and displayed below."
+).format_map
+_EXECUTE_SUCCESS_TEXT = (
+    "Command executed successfully!\n\n"
+    "Command: {command}\n"
+    "Command Index: {commandIndex}\n"
+    "Result: {result}\n\n"
+    "Updated screenshot displayed below."
+).format
+_EXECUTE_UNCHANGED_TEXT = (
+    "Command executed successfully!\n\n"
+    "Command: {command}\n"
+    "Command Index: {commandIndex}\n"
+    "Result: {result}\n\n"
+    "Screenshot unchanged since the previous response: {screenshotHash}"
+).format
+_END_SUCCESS_TEXT = (
+    "Session ended successfully!\n\n"
+    "Commands executed: {commandsExecuted}\n"
+    "Result: {result}"
+).format
+_STATUS_TEXT = (
+    "Rabbitize Session Status:\n\n"
+    "Active: {isActive}\n"
+    "Session ID: {sessionId}\n"
+    "Client ID: {clientId}\n"
+    "Test ID: {testId}\n"
+    "Commands executed: {commandCounter}\n"
+    "Base URL: {baseUrl}"
+).format_map
+
+def _make_text_content(text: str) -> Dict[str, Any]:
+    """MCP text content item"""
+    return {"type": "text", "text": text}
+
+def _make_image_content(image_b64: Union[str, bytes]) -> Dict[str, Any]:
+    """MCP image content item for a base64 JPEG screenshot"""
+    return {"type": "image", "data": image_b64, "mimeType": "image/jpeg"}
+
+def _make_image_resource_content(image_path: str) -> Dict[str, Any]:
+    """MCP resource content item pointing at a screenshot file on this host"""
+    return {"type": "resource", "resource": {"uri": Path(image_path).as_uri(), "mimeType": "image/jpeg"}}
+
+def _make_content(text: str, image_b64: Union[str, bytes, None] = None,
+                  image_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Tool result content: a text item, followed by the screenshot when there is one"""
+    content = [_make_text_content(text)]
+    if image_b64:
+        content.append(_make_image_content(image_b64))
+    elif image_path:
+        content.append(_make_image_resource_content(image_path))
+    return content
+
 class MCPServer:
     """Simple MCP Server implementation using JSON-RPC over stdin/stdout"""
 
-    def __init__(self, rabbitize_url: str = "http://localhost:3000"):
+    def __init__(self, rabbitize_url: str = "http://localhost:3000", screenshot_timeout: float = DEFAULT_SCREENSHOT_TIMEOUT,
+                 screenshot_mode: str = "inline"):
         self.rabbitize_url = rabbitize_url
-        self.rabbitize_session = RabbitizeSession(rabbitize_url)
+        self.rabbitize_session = RabbitizeSession(
+            rabbitize_url,
+            screenshot_timeout=screenshot_timeout,
+            screenshot_mode=screenshot_mode
+        )
         self.tools = {}
         self.server_info = {
             "name": "rabbitize-mcp-server",
@@ -274,9 +522,35 @@ class MCPServer:
         # Register tools
         self._register_tools()
 
-        # Setup signal handlers
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Tool descriptors and server info never change after registration, so
+        # their result bodies are serialized once and spliced into each response
+        self._server_info_body = _json_dumps(self.server_info)
+        self._tools_list_body = _json_dumps({"tools": list(self.tools.values())})
+
+        # JSON-RPC method and tool name -> handler
+        self._method_dispatch = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call
+        }
+        self._tool_dispatch = {
+            "rabbitize_start_session": self._tool_start_session,
+            "rabbitize_execute": self._tool_execute,
+            "rabbitize_get_screenshot": self._tool_get_screenshot,
+            "rabbitize_end_session": self._tool_end_session,
+            "rabbitize_status": self._tool_status
+        }
+
+        # Requests run as concurrent tasks, but these tools drive or read the one shared
+        # session (and its screenshot caches), so they take turns under _session_lock.
+        # Read-only calls (tools/list, rabbitize_status) run alongside them.
+        self._session_tools = frozenset((
+            "rabbitize_start_session",
+            "rabbitize_execute",
+            "rabbitize_get_screenshot",
+            "rabbitize_end_session"
+        ))
+        self._session_lock = asyncio.Lock()
 
         logger.info(f"MCP Server initialized with Rabbitize at {rabbitize_url}")
 
@@ -344,18 +618,10 @@ class MCPServer:
             }
         }
 
-    def _signal_handler(self, signum, frame):
-        """Handle shutdown signals"""
+    def _signal_handler(self, signum, main_task: asyncio.Task):
+        """Handle shutdown signals by stopping the main loop; run() ends the session and cleans up"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
-
-        # End the session if active
-        if self.rabbitize_session.is_active:
-            self.rabbitize_session.end_session()
-
-        # Cleanup
-        self.rabbitize_session.cleanup()
-
-        sys.exit(0)
+        main_task.cancel()
 
     def _create_response(self, request_id: Union[str, int, None], result: Any = None, error: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create a JSON-RPC response"""
@@ -371,6 +637,10 @@ class MCPServer:
 
         return response
 
+    def _create_raw_response(self, request_id: Union[str, int, None], result_body: bytes) -> bytes:
+        """Create a serialized JSON-RPC response around an already serialized result"""
+        return b'{"jsonrpc":"2.0","id":' + _json_dumps(request_id) + b',"result":' + result_body + b'}'
+
     def _create_error(self, code: int, message: str, data: Any = None) -> Dict[str, Any]:
         """Create a JSON-RPC error object"""
         error = {
@@ -383,218 +653,138 @@ class MCPServer:
 
         return error
 
-    def _handle_initialize(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_initialize(self, request: Dict[str, Any]) -> bytes:
         """Handle initialize request"""
-        return self._create_response(
-            request.get("id"),
-            result=self.server_info
-        )
+        return self._create_raw_response(request.get("id"), self._server_info_body)
 
-    def _handle_tools_list(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_tools_list(self, request: Dict[str, Any]) -> bytes:
         """Handle tools/list request"""
-        return self._create_response(
-            request.get("id"),
-            result={
-                "tools": list(self.tools.values())
-            }
-        )
+        return self._create_raw_response(request.get("id"), self._tools_list_body)
 
-    def _handle_tools_call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_tools_call(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/call request"""
         try:
             params = request.get("params", {})
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
 
-            if tool_name not in self.tools:
+            handler = self._tool_dispatch.get(tool_name)
+            if handler is None:
                 return self._create_response(
                     request.get("id"),
                     error=self._create_error(-32601, f"Tool not found: {tool_name}")
                 )
 
             # Execute the tool
-            if tool_name == "rabbitize_start_session":
-                url = arguments.get("url")
-                if not url:
-                    return self._create_response(
-                        request.get("id"),
-                        error=self._create_error(-32602, "Missing required parameter: url")
-                    )
-
-                result = self.rabbitize_session.start_session(url)
-
-                content = []
-                if result["success"]:
-                    content.append({
-                        "type": "text",
-                        "text": f"Session started successfully!\n\n"
-                               f"Session ID: {result.get('sessionId')}\n"
-                               f"URL: {result.get('url')}\n"
-                               f"Client ID: {result.get('clientId')}\n"
-                               f"Test ID: {result.get('testId')}\n\n"
-                               f"Initial screenshot captured and displayed below."
-                    })
-
-                    if result.get("screenshot"):
-                        content.append({
-                            "type": "image",
-                            "data": result["screenshot"],
-                            "mimeType": "image/jpeg"
-                        })
-                else:
-                    content.append({
-                        "type": "text",
-                        "text": f"Failed to start session: {result.get('error', 'Unknown error')}"
-                    })
+            if tool_name in self._session_tools:
+                async with self._session_lock:
+                    return await handler(request.get("id"), arguments)
+            return await handler(request.get("id"), arguments)
 
-                return self._create_response(
-                    request.get("id"),
-                    result={"content": content}
-                )
+        except Exception as e:
+            logger.error(f"Error handling tool call: {str(e)}")
+            return self._create_response(
+                request.get("id"),
+                error=self._create_error(-32603, f"Internal error: {str(e)}")
+            )
 
-            elif tool_name == "rabbitize_execute":
-                command = arguments.get("command")
-                if not command:
-                    return self._create_response(
-                        request.get("id"),
-                        error=self._create_error(-32602, "Missing required parameter: command")
-                    )
-
-                result = self.rabbitize_session.execute_command(command)
-
-                content = []
-                if result["success"]:
-                    content.append({
-                        "type": "text",
-                        "text": f"Command executed successfully!\n\n"
-                               f"Command: {' '.join(result['command'])}\n"
-                               f"Command Index: {result.get('commandIndex')}\n"
-                               f"Result: {json.dumps(result.get('result', {}), indent=2)}\n\n"
-                               f"Updated screenshot displayed below."
-                    })
-
-                    if result.get("screenshot"):
-                        content.append({
-                            "type": "image",
-                            "data": result["screenshot"],
-                            "mimeType": "image/jpeg"
-                        })
-                else:
-                    content.append({
-                        "type": "text",
-                        "text": f"Failed to execute command: {result.get('error', 'Unknown error')}"
-                    })
+    async def _tool_start_session(self, request_id: Union[str, int, None], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """rabbitize_start_session tool"""
+        url = arguments.get("url")
+        if not url:
+            return self._create_response(
+                request_id,
+                error=self._create_error(-32602, "Missing required parameter: url")
+            )
 
-                return self._create_response(
-                    request.get("id"),
-                    result={"content": content}
-                )
+        result = await self.rabbitize_session.start_session(url)
 
-            elif tool_name == "rabbitize_get_screenshot":
-                if not self.rabbitize_session.is_active:
-                    return self._create_response(
-                        request.get("id"),
-                        result={"content": [{
-                            "type": "text",
-                            "text": "No active session. Please start a session first."
-                        }]}
-                    )
-
-                screenshot_b64 = self.rabbitize_session.get_latest_screenshot()
-
-                content = []
-                if screenshot_b64:
-                    content.append({
-                        "type": "text",
-                        "text": "Latest screenshot from the active session:"
-                    })
-                    content.append({
-                        "type": "image",
-                        "data": screenshot_b64,
-                        "mimeType": "image/jpeg"
-                    })
-                else:
-                    content.append({
-                        "type": "text",
-                        "text": "No screenshot available. The session may not have started yet or there was an error."
-                    })
+        if result["success"]:
+            content = _make_content(_START_SUCCESS_TEXT(result), result.get("screenshot"), result.get("screenshotPath"))
+        else:
+            content = _make_content(f"Failed to start session: {result.get('error', 'Unknown error')}")
 
-                return self._create_response(
-                    request.get("id"),
-                    result={"content": content}
-                )
+        return self._create_response(request_id, result={"content": content})
 
-            elif tool_name == "rabbitize_end_session":
-                result = self.rabbitize_session.end_session()
-
-                content = []
-                if result["success"]:
-                    content.append({
-                        "type": "text",
-                        "text": f"Session ended successfully!\n\n"
-                               f"Commands executed: {result.get('commandsExecuted', 0)}\n"
-                               f"Result: {json.dumps(result.get('result', {}), indent=2)}"
-                    })
-                else:
-                    content.append({
-                        "type": "text",
-                        "text": f"Failed to end session: {result.get('error', 'Unknown error')}"
-                    })
+    async def _tool_execute(self, request_id: Union[str, int, None], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """rabbitize_execute tool"""
+        command = arguments.get("command")
+        if not command:
+            return self._create_response(
+                request_id,
+                error=self._create_error(-32602, "Missing required parameter: command")
+            )
 
-                return self._create_response(
-                    request.get("id"),
-                    result={"content": content}
-                )
+        result = await self.rabbitize_session.execute_command(command)
 
-            elif tool_name == "rabbitize_status":
-                status = self.rabbitize_session.get_session_status()
+        if result["success"]:
+            fields = dict(
+                command=' '.join(result['command']),
+                commandIndex=result.get('commandIndex'),
+                result=json.dumps(result.get('result', {}), indent=2)
+            )
+            if result.get("screenshotUnchanged"):
+                content = _make_content(_EXECUTE_UNCHANGED_TEXT(screenshotHash=result['screenshotHash'], **fields))
+            else:
+                content = _make_content(_EXECUTE_SUCCESS_TEXT(**fields), result.get("screenshot"), result.get("screenshotPath"))
+        else:
+            content = _make_content(f"Failed to execute command: {result.get('error', 'Unknown error')}")
 
-                content = [{
-                    "type": "text",
-                    "text": f"Rabbitize Session Status:\n\n"
-                           f"Active: {status['isActive']}\n"
-                           f"Session ID: {status.get('sessionId', 'None')}\n"
-                           f"Client ID: {status['clientId']}\n"
-                           f"Test ID: {status['testId']}\n"
-                           f"Commands executed: {status['commandCounter']}\n"
-                           f"Base URL: {status['baseUrl']}"
-                }]
+        return self._create_response(request_id, result={"content": content})
 
-                return self._create_response(
-                    request.get("id"),
-                    result={"content": content}
-                )
+    async def _tool_get_screenshot(self, request_id: Union[str, int, None], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """rabbitize_get_screenshot tool"""
+        if not self.rabbitize_session.is_active:
+            content = _make_content("No active session. Please start a session first.")
+            return self._create_response(request_id, result={"content": content})
 
-            else:
-                return self._create_response(
-                    request.get("id"),
-                    error=self._create_error(-32601, f"Unknown tool: {tool_name}")
-                )
+        screenshot_b64 = None
+        screenshot_path = None
+        if self.rabbitize_session.screenshot_mode == "uri":
+            screenshot_path = await self.rabbitize_session.get_latest_screenshot_path()
+        else:
+            screenshot_b64 = await self.rabbitize_session.get_latest_screenshot()
 
-        except Exception as e:
-            logger.error(f"Error handling tool call: {str(e)}")
-            return self._create_response(
-                request.get("id"),
-                error=self._create_error(-32603, f"Internal error: {str(e)}")
-            )
+        if screenshot_b64 or screenshot_path:
+            content = _make_content("Latest screenshot from the active session:", screenshot_b64, screenshot_path)
+        else:
+            content = _make_content("No screenshot available. The session may not have started yet or there was an error.")
+
+        return self._create_response(request_id, result={"content": content})
+
+    async def _tool_end_session(self, request_id: Union[str, int, None], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """rabbitize_end_session tool"""
+        result = await self.rabbitize_session.end_session()
+
+        if result["success"]:
+            content = _make_content(_END_SUCCESS_TEXT(
+                commandsExecuted=result.get('commandsExecuted', 0),
+                result=json.dumps(result.get('result', {}), indent=2)
+            ))
+        else:
+            content = _make_content(f"Failed to end session: {result.get('error', 'Unknown error')}")
+
+        return self._create_response(request_id, result={"content": content})
 
-    def _handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _tool_status(self, request_id: Union[str, int, None], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """rabbitize_status tool"""
+        content = _make_content(_STATUS_TEXT(self.rabbitize_session.get_session_status()))
+        return self._create_response(request_id, result={"content": content})
+
+    async def _handle_request(self, request: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
         """Handle incoming JSON-RPC request"""
         try:
             method = request.get("method")
 
-            if method == "initialize":
-                return self._handle_initialize(request)
-            elif method == "tools/list":
-                return self._handle_tools_list(request)
-            elif method == "tools/call":
-                return self._handle_tools_call(request)
-            else:
+            handler = self._method_dispatch.get(method)
+            if handler is None:
                 return self._create_response(
                     request.get("id"),
                     error=self._create_error(-32601, f"Method not found: {method}")
                 )
 
+            return await handler(request)
+
         except Exception as e:
             logger.error(f"Error handling request: {str(e)}")
             return self._create_response(
@@ -602,46 +792,139 @@ class MCPServer:
                 error=self._create_error(-32603, f"Internal error: {str(e)}")
             )
 
-    def run(self):
+    async def _process_line(self, line: bytes, responses: asyncio.Queue):
+        """Parse and handle one JSON-RPC request line, queueing its response for the writer"""
+        try:
+            request = _json_loads(line)
+            response = await self._handle_request(request)
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON received: {str(e)}")
+            response = self._create_response(
+                None,
+                error=self._create_error(-32700, "Parse error")
+            )
+
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            response = self._create_response(
+                None,
+                error=self._create_error(-32603, f"Internal error: {str(e)}")
+            )
+
+        await responses.put(response)
+
+    async def _read_stdin_lines(self, loop: asyncio.AbstractEventLoop):
+        """Yield request lines from stdin until it closes, or None for a line over MAX_REQUEST_LINE.
+
+        A pipe or socket is read through an asyncio stream. Pipe transports reject
+        regular files, so stdin redirected from a file is read on a worker thread.
+        """
+        if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+            stdin = sys.stdin.buffer
+            while line := await asyncio.to_thread(stdin.readline, MAX_REQUEST_LINE + 1):
+                if len(line) > MAX_REQUEST_LINE:
+                    # Drop the rest of the line, through its newline
+                    while not line.endswith(b'\n') and (line := await asyncio.to_thread(stdin.readline, MAX_REQUEST_LINE)):
+                        pass
+                    yield None
+                else:
+                    yield line
+            return
+
+        reader = asyncio.StreamReader(limit=MAX_REQUEST_LINE)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        while True:
+            try:
+                yield await reader.readuntil(b'\n')
+            except asyncio.IncompleteReadError as e:
+                # stdin closed: hand over a final line without a newline, then stop
+                if e.partial:
+                    yield e.partial
+                return
+            except asyncio.LimitOverrunError as e:
+                await self._discard_oversized_line(reader, e.consumed)
+                yield None
+
+    @staticmethod
+    async def _discard_oversized_line(reader: asyncio.StreamReader, consumed: int):
+        """Drop the rest of a line that overran the reader's limit, through its newline"""
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b'\n')
+                return
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+            except asyncio.IncompleteReadError:
+                return  # stdin closed mid-line
+
+    async def _write_responses(self, responses: asyncio.Queue):
+        """Single stdout writer, so concurrently produced responses never interleave.
+
+        Responses are dicts, or bytes that were serialized ahead of time. Bytes go
+        straight to the stdout buffer, skipping the text encoder.
+        """
+        stdout = sys.stdout.buffer
+        while True:
+            response = await responses.get()
+            stdout.write(response if isinstance(response, bytes) else _json_dumps(response))
+            stdout.write(b'\n')
+            stdout.flush()
+            responses.task_done()
+
+    async def run(self):
         """Run the MCP server"""
+        loop = asyncio.get_running_loop()
+        main_task = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._signal_handler, signum, main_task)
+
+        responses: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._write_responses(responses))
+        in_flight = set()
+
         try:
             logger.info("Starting Rabbitize MCP Server...")
 
-            # Read from stdin and write to stdout
-            for line in sys.stdin:
+            # Read from stdin without blocking the event loop; each request runs as its
+            # own task so a slow /execute doesn't hold up requests behind it
+            async for line in self._read_stdin_lines(loop):
+                if line is None:
+                    # Reject the oversized request but keep serving the ones after it
+                    logger.error(f"Request line exceeds {MAX_REQUEST_LINE} bytes, discarded")
+                    await responses.put(self._create_response(
+                        None,
+                        error=self._create_error(-32600, f"Invalid Request: line exceeds {MAX_REQUEST_LINE} bytes")
+                    ))
+                    continue
+
                 line = line.strip()
                 if not line:
                     continue
 
-                try:
-                    request = json.loads(line)
-                    response = self._handle_request(request)
+                task = asyncio.create_task(self._process_line(line, responses))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
 
-                    # Write response to stdout
-                    print(json.dumps(response), flush=True)
+            # stdin closed: finish outstanding requests and flush their responses
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            await responses.join()
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON received: {str(e)}")
-                    error_response = self._create_response(
-                        None,
-                        error=self._create_error(-32700, "Parse error")
-                    )
-                    print(json.dumps(error_response), flush=True)
-
-                except Exception as e:
-                    logger.error(f"Unexpected error: {str(e)}")
-                    error_response = self._create_response(
-                        None,
-                        error=self._create_error(-32603, f"Internal error: {str(e)}")
-                    )
-                    print(json.dumps(error_response), flush=True)
-
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             logger.info("Server stopped by user")
         except Exception as e:
             logger.error(f"Server error: {str(e)}")
         finally:
-            self.rabbitize_session.cleanup()
+            for task in in_flight:
+                task.cancel()
+            writer_task.cancel()
+
+            # End the session if active
+            if self.rabbitize_session.is_active:
+                await self.rabbitize_session.end_session()
+            await self.rabbitize_session.cleanup()
 
 def main():
     """Main entry point"""
@@ -653,6 +936,19 @@ def main():
         default="http://localhost:3000",
         help="Base URL for Rabbitize server (default: http://localhost:3000)"
     )
+    parser.add_argument(
+        "--screenshot-timeout",
+        type=float,
+        default=DEFAULT_SCREENSHOT_TIMEOUT,
+        help=f"Seconds to wait for a fresh screenshot after each command (default: {DEFAULT_SCREENSHOT_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--screenshot-mode",
+        choices=SCREENSHOT_MODES,
+        default="inline",
+        help="Return screenshots as inline base64 images, or as file:// resource URIs for clients "
+             "running on the same host (default: inline)"
+    )
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
@@ -666,8 +962,8 @@ def main():
     logging.getLogger().setLevel(getattr(logging, args.log_level))
 
     # Create and run server
-    server = MCPServer(args.rabbitize_url)
-    server.run()
+    server = MCPServer(args.rabbitize_url, args.screenshot_timeout, args.screenshot_mode)
+    asyncio.run(server.run())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,4 +1,7 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+import httpx
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import logging
@@ -6,6 +9,7 @@ import json
 import time
 import os
 import base64
+import binascii
 from PIL import Image, ImageDraw
 import imagehash
 import io
@@ -15,9 +19,18 @@ import traceback
 import signal
 import threading
 from concurrent.futures import ThreadPoolExecutor  # Add proper import
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from fastapi.middleware.cors import CORSMiddleware  # Import CORS middleware
 from typing import Optional, List, Dict, Tuple, Any
 import hashlib
+from collections import OrderedDict
+import re
+import queue
+import socket
+import random
+import asyncio
+import atexit
+from contextlib import asynccontextmanager
 
 # Import Rich for beautiful console output
 from rich.console import Console
@@ -72,19 +85,72 @@ logging.basicConfig(
     ]
 )
 
+# orjson serializes logged payloads and Gemini request bodies much faster; fall back to json without it
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def json_body(obj, default=None) -> bytes:
+    """Serialize an HTTP request body to JSON bytes"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; json handles those
+    return json.dumps(obj, default=default).encode('utf-8')
+
+def json_loads(text):
+    """Parse JSON text; raises json.JSONDecodeError on invalid input either way"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity literals, which json accepts
+    return json.loads(text)
+
+def json_text(obj) -> str:
+    """Serialize obj to a JSON string, converting anything unserializable with str()"""
+    return json_body(obj, default=str).decode('utf-8')
+
+def json_body_with_raw_field(obj: dict, key: str, raw_json: bytes) -> bytes:
+    """Serialize a non-empty dict plus one extra field whose value is already-serialized JSON"""
+    return json_body(obj)[:-1] + b',' + json_body(key) + b':' + raw_json + b'}'
+
 # Create custom logger class for enhanced logging
 class RichLogger:
+    __slots__ = ('logger', 'console')
+
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self.console = console
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Check the level before building an expensive message; data panels bypass logging's own check"""
+        return self.logger.isEnabledFor(level)
+
     def _format_json(self, data: dict) -> Syntax:
         """Format JSON data with syntax highlighting"""
-        json_str = json.dumps(data, indent=2, default=str)
+        json_str = None
+        if HAS_ORJSON:
+            try:
+                json_str = orjson.dumps(data, default=str,
+                                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; json handles those
+        if json_str is None:
+            json_str = json.dumps(data, indent=2, default=str)
         return Syntax(json_str, "json", theme="monokai", line_numbers=False)
 
     def _log_with_style(self, level: str, message: str, data: dict = None, style: str = None):
-        """Log with enhanced formatting"""
+        """Log with enhanced formatting.
+
+        data may be a zero-argument callable returning the dict, so a costly one is
+        only built once the level check has passed.
+        """
+        if callable(data):
+            data = data()
         if data and isinstance(data, dict):
             # Pretty print JSON data
             self.console.print(f"[{style or level}]{message}[/{style or level}]")
@@ -93,18 +159,24 @@ class RichLogger:
             getattr(self.logger, level)(f"[{style or level}]{message}[/{style or level}]")
 
     def info(self, message: str, data: dict = None):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if data:
             self._log_with_style("info", message, data)
         else:
             self.logger.info(f"[info]{message}[/info]")
 
     def warning(self, message: str, data: dict = None):
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         if data:
             self._log_with_style("warning", message, data)
         else:
             self.logger.warning(f"[warning]{message}[/warning]")
 
     def error(self, message: str, data: dict = None, exc_info: bool = False):
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         if exc_info:
             self.logger.error(f"[error]{message}[/error]", exc_info=True)
         elif data:
@@ -113,12 +185,16 @@ class RichLogger:
             self.logger.error(f"[error]{message}[/error]")
 
     def debug(self, message: str, data: dict = None):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         if data:
             self._log_with_style("debug", message, data)
         else:
             self.logger.debug(f"[debug]{message}[/debug]")
 
     def critical(self, message: str, data: dict = None):
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
         if data:
             self._log_with_style("critical", message, data)
         else:
@@ -126,13 +202,21 @@ class RichLogger:
 
     def success(self, message: str, data: dict = None):
         """Custom success level logging"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if data:
             self._log_with_style("info", message, data, style="success")
         else:
             self.logger.info(f"[success]{message}[/success]")
 
     def api_call(self, message: str, endpoint: str = None, payload: dict = None, response: dict = None):
-        """Special logging for API calls"""
+        """Special logging for API calls (payload and response may be callables, as for data)"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if callable(payload):
+            payload = payload()
+        if callable(response):
+            response = response()
         self.console.print(f"[api_call]🌐 API Call: {message}[/api_call]")
         if endpoint:
             self.console.print(f"  [dim]Endpoint:[/dim] {endpoint}")
@@ -155,6 +239,41 @@ except ImportError:
     logging.warning("pytesseract not found. OCR functionality will be disabled.")
     HAS_TESSERACT = False
 
+# BLAKE3 is much faster than the stdlib hashes for naming saved images; fall back to BLAKE2 without it
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+# Numba compiles the base64 byte scan used when trimming log payloads; NumPy is used without it
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# pybase64 encodes with SIMD, several times faster than the stdlib; fall back to base64 without it
+try:
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
+
+# inotify lets get_screenshot wake as soon as Rabbitize writes the file (Linux only); fall back to polling without it
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+# h2 (the httpx[http2] extra) lets ASYNC_HTTP_CLIENT use HTTP/2; httpx raises ImportError for http2=True without it, so fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
 # --- Firebase Integration ---
 import firebase_admin
 from firebase_admin import credentials, db
@@ -167,6 +286,9 @@ gcs_initialized = False
 gcs_client = None
 GCS_BUCKET_NAME = "rabbitize.firebasestorage.app"
 
+# Debug artifacts are written off the agent loop; nothing waits on their result
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gcs-upload")
+
 try:
     # Check if we have credentials in environment variables
     firebase_creds_json = os.getenv("FIREBASE_CREDENTIALS")
@@ -225,7 +347,7 @@ except Exception as e:
     logger.error(f"Failed to initialize Firebase: {e}", exc_info=True)
     firebase_initialized = False
 
-def generate_timeout_summary(objective: str, history: list, client_id: str, test_id: str, session_id: str = None, rabbitize_url: str = None) -> str:
+async def generate_timeout_summary(objective: str, history: list, client_id: str, test_id: str, session_id: str = None, rabbitize_url: str = None) -> str:
     """
     Generate a summary of the session when it times out.
     """
@@ -302,12 +424,12 @@ progress, and potential reasons for the timeout. Be clear and concise."""
         )
 
         # This uses the globally defined GEMINI_API_URL and api_key
-        response = call_gemini_api(payload, timeout=25) # Increased timeout for summary
+        response = await call_gemini_api_async(payload, timeout=25) # Increased timeout for summary
 
         if response and "candidates" in response and len(response["candidates"]) > 0:
             candidate = response["candidates"][0]
             if "content" in candidate and "parts" in candidate["content"]:
-                summary_text = "".join(part.get("text", "") for part in candidate["content"]["parts"]).strip()
+                summary_text = "".join([part.get("text", "") for part in candidate["content"]["parts"]]).strip()
                 if summary_text:
                     logger.success(f"✅ Successfully generated timeout summary for {client_id}/{test_id}")
                     # Log thinking event after API call (success)
@@ -355,7 +477,12 @@ progress, and potential reasons for the timeout. Be clear and concise."""
         return f"Error during automated summary generation: {str(e)}. The session ended due to the step limit."
 
 # --- FastAPI App Initialization ---
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await ASYNC_HTTP_CLIENT.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS middleware
 app.add_middleware(
@@ -447,6 +574,35 @@ GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemin
 GEMINI_API_FLASH_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-05-20:generateContent?key={api_key}"
 #GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
 
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets also enable TCP keepalive.
+
+    urllib3 already sets TCP_NODELAY, so small Rabbitize commands aren't held back by
+    Nagle; SO_KEEPALIVE keeps idle pooled connections (e.g. to Gemini between turns)
+    from being silently dropped by NATs and load balancers.
+    """
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", self.SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", self.SOCKET_OPTIONS)
+        return super().proxy_manager_for(*args, **kwargs)
+
+# Shared keep-alive session for synchronous calls to Gemini and Rabbitize, so each
+# request reuses a pooled connection instead of a new TCP/TLS handshake
+# (pools for up to 10 hosts, 20 connections each so concurrent agent runs don't queue)
+HTTP_SESSION = requests.Session()
+_http_adapter = KeepAliveAdapter(pool_connections=10, pool_maxsize=20)
+HTTP_SESSION.mount("http://", _http_adapter)
+HTTP_SESSION.mount("https://", _http_adapter)
+
+# Shared async client for Gemini calls made from async handlers; pools connections (HTTP/2 when h2 is installed)
+# and is closed by the app's lifespan handler
+ASYNC_HTTP_CLIENT = httpx.AsyncClient(timeout=30, http2=HAS_H2)
+
 # --- Pydantic Model for Task Request ---
 class TaskRequest(BaseModel):
     rabbitize_url: str
@@ -458,32 +614,264 @@ class TaskRequest(BaseModel):
     max_steps: int = 20
 
 # --- Helper Functions ---
-# Configure timeouts using simpler approach without threads
+class DaemonThreadPool:
+    """A bounded pool of reused daemon worker threads, with a submit() like ThreadPoolExecutor's.
+
+    ThreadPoolExecutor's workers are non-daemon, so a call that hangs keeps the interpreter
+    from exiting. These workers are daemons: a hung call still holds its worker (at most
+    max_workers run at once and the rest queue), but never blocks exit.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._work = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._idle = 0  # Waiting workers not yet claimed by a submit
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        future = Future()
+        self._work.put((future, func, args, kwargs))
+        with self._lock:
+            if self._idle:
+                self._idle -= 1
+            elif self._threads < self._max_workers:
+                self._threads += 1
+                threading.Thread(target=self._worker, name=f"{self._thread_name_prefix}_{self._threads}",
+                                 daemon=True).start()
+        return future
+
+    def _worker(self):
+        while True:
+            future, func, args, kwargs = self._work.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            del future, func, args, kwargs
+            with self._lock:
+                self._idle += 1
+
+# Shared workers for with_timeout; a call that times out keeps its worker until it finishes
+_TIMEOUT_POOL = DaemonThreadPool(max_workers=32, thread_name_prefix="with_timeout")
+# The early screenshot comparison in get_next_action gets its own workers so it never
+# queues behind hung with_timeout calls
+_COMPARE_POOL = DaemonThreadPool(max_workers=4, thread_name_prefix="compare_screenshots")
+
 def with_timeout(func, args=(), kwargs=None, timeout_duration=10, default=None):
     """Run a function with a timeout, returning default value if it times out"""
     if kwargs is None:
         kwargs = {}
 
-    result = [default]
+    future = _TIMEOUT_POOL.submit(func, *args, **kwargs)
+    return result_with_timeout(future, func.__name__, timeout_duration, default)
 
-    def target():
-        try:
-            result[0] = func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Error in function {func.__name__}: {e}", exc_info=True)
-
-    thread = threading.Thread(target=target)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout_duration)
+def result_with_timeout(future, name: str, timeout_duration: float, default=None):
+    """Wait for a future from a DaemonThreadPool, returning default if it times out or fails.
 
-    if thread.is_alive():
-        logger.warning(f"Function {func.__name__} timed out after {timeout_duration} seconds")
+    Lets callers start work early and collect it later under the same rules as with_timeout.
+    """
+    try:
+        return future.result(timeout=timeout_duration)
+    except FuturesTimeoutError:
+        logger.warning(f"Function {name} timed out after {timeout_duration} seconds")
+        future.cancel()  # Drops it if it is still queued behind busy workers
         return default
+    except Exception as e:
+        logger.error(f"Error in function {name}: {e}", exc_info=True)
+        return default
+
+# Base64 alphabet (with padding) and the whitespace that base64 detection ignores
+BASE64_ALPHABET_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/='
+BASE64_WHITESPACE_BYTES = b' \n\r\t'
+
+# Byte classes for base64 detection: 0 = other, 1 = base64 alphabet, 2 = whitespace (ignored)
+BASE64_BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+BASE64_BYTE_CLASS[np.frombuffer(BASE64_ALPHABET_BYTES, dtype=np.uint8)] = 1
+BASE64_BYTE_CLASS[np.frombuffer(BASE64_WHITESPACE_BYTES, dtype=np.uint8)] = 2
+
+# Base64 character -> 6-bit value; 0xFF for padding and anything outside the alphabet
+BASE64_DECODE_TABLE = np.full(256, 0xFF, dtype=np.uint8)
+BASE64_DECODE_TABLE[np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/', dtype=np.uint8)] = np.arange(64, dtype=np.uint8)
+
+# Leading text of base64 strings (and data URLs) that are always treated as images
+BASE64_IMAGE_PREFIXES = (
+    '/9j/',  # JPEG
+    'iVBORw0KGgoAAAANSUhEUgAA',  # PNG
+    'R0lGODlhAQABAIAAAAAAAP',  # GIF
+    'UklGRg==',  # WebP
+    'data:image/',  # Data URL prefix
+)
+
+# Characters a base64 candidate may start with: the alphabet plus whitespace the scan ignores
+BASE64_LEADING_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/ \n\r\t')
 
-    return result[0]
+# Leading characters sampled before a full base64 scan
+BASE64_SAMPLE_CHARS = 256
 
-def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, test_id: str = None, session_id: str = None) -> Dict:
+# Leading base64 characters decoded while scanning (16 chars -> 12 bytes, enough for IMAGE_MAGIC_TABLE)
+BASE64_HEAD_CHARS = 16
+
+def scan_base64_head_loop(value_bytes, byte_class, decode_table):
+    """Count byte classes and decode the leading base64 characters in the same pass.
+
+    Returns (counts, head) where head holds the bytes decoded from up to
+    BASE64_HEAD_CHARS leading characters (whitespace skipped, stopping at
+    padding or the first non-base64 byte). Meant to be compiled with Numba;
+    scan_base64_head_numpy returns the same result without it.
+    """
+    counts = np.zeros(3, dtype=np.int64)
+    head = np.zeros(BASE64_HEAD_CHARS // 4 * 3, dtype=np.uint8)
+    head_size = 0
+    sextets = 0
+    acc = 0
+    for i in range(value_bytes.size):
+        b = value_bytes[i]
+        cls = byte_class[b]
+        counts[cls] += 1
+        if sextets < BASE64_HEAD_CHARS and cls != 2:
+            d = decode_table[b]
+            if d == 0xFF:
+                sextets = BASE64_HEAD_CHARS
+                continue
+            acc = (acc << 6) | d
+            sextets += 1
+            if sextets % 4 == 0:
+                head[head_size] = (acc >> 16) & 0xFF
+                head[head_size + 1] = (acc >> 8) & 0xFF
+                head[head_size + 2] = acc & 0xFF
+                head_size += 3
+                acc = 0
+    return counts, head[:head_size]
+
+def scan_base64_head_numpy(value_bytes, byte_class, decode_table):
+    """Vectorized scan_base64_head_loop, returning the same (counts, head)"""
+    classes = byte_class[value_bytes]
+    counts = np.bincount(classes, minlength=3)
+    lead = value_bytes[:BASE64_HEAD_CHARS * 4]
+    lead = lead[classes[:lead.size] != 2]
+    if lead.size < BASE64_HEAD_CHARS:
+        # Mostly whitespace so far: look past it, as the loop does
+        lead = value_bytes[classes != 2]
+    lead = lead[:BASE64_HEAD_CHARS]
+    invalid = np.flatnonzero(decode_table[lead] == 0xFF)
+    usable = (int(invalid[0]) if invalid.size else lead.size) // 4 * 4
+    head = np.frombuffer(binascii.a2b_base64(lead[:usable].tobytes()), dtype=np.uint8)
+    return counts, head
+
+# Compiled single pass when Numba is installed, NumPy otherwise
+if HAS_NUMBA:
+    scan_base64_head = njit(cache=True, nogil=True)(scan_base64_head_loop)
+else:
+    scan_base64_head = scan_base64_head_numpy
+
+# (offset, magic bytes, extension, MIME type) for saved payload images, checked in order
+IMAGE_MAGIC_TABLE = (
+    (0, b'\xff\xd8\xff', 'jpg', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (0, b'GIF87a', 'gif', 'image/gif'),
+    (0, b'GIF89a', 'gif', 'image/gif'),
+    (8, b'WEBP', 'webp', 'image/webp'),  # Only inside a RIFF container
+    (0, b'BM', 'bmp', 'image/bmp'),
+    (6, b'JFIF', 'jpg', 'image/jpeg'),
+    (6, b'Exif', 'jpg', 'image/jpeg'),
+)
+
+# Data URL image subtype -> (extension, MIME type), used when the magic bytes aren't recognised
+DATA_URL_IMAGE_TYPES = {
+    'jpeg': ('jpg', 'image/jpeg'),
+    'jpg': ('jpg', 'image/jpeg'),
+    'png': ('png', 'image/png'),
+    'gif': ('gif', 'image/gif'),
+    'webp': ('webp', 'image/webp'),
+}
+
+def detect_image_magic(head: bytes) -> Optional[Tuple[str, str]]:
+    """Return (extension, MIME type) for the image format whose magic bytes are in head, or None"""
+    for offset, magic, extension, mime_type in IMAGE_MAGIC_TABLE:
+        # startswith at an offset compares in place, without slicing head
+        if head.startswith(magic, offset) and (offset != 8 or head.startswith(b'RIFF')):
+            return extension, mime_type
+    return None
+
+# First character that can't appear in base64 text (padding is checked separately)
+BASE64_INVALID_CHAR = re.compile(r'[^A-Za-z0-9+/=]')
+
+def is_base64_text(value: str) -> bool:
+    """True if value is only base64 alphabet characters with at most two trailing '='.
+
+    Equivalent to matching r'^[A-Za-z0-9+/]*={0,2}$', but the search stops at the
+    first bad character and the padding check is a single find.
+    """
+    if BASE64_INVALID_CHAR.search(value):
+        return False
+    pad = value.find('=')
+    return pad == -1 or (pad >= len(value) - 2 and not value[pad:].strip('='))
+
+def looks_like_json_container(value: str) -> bool:
+    """True if value looks like a JSON array/object: '[' or '{' first and ']' or '}' last, ignoring whitespace.
+
+    Only the ends are inspected, so a large string isn't copied by lstrip()/rstrip().
+    """
+    return value[:64].lstrip().startswith(('[', '{')) and value[-64:].rstrip().endswith((']', '}'))
+
+# Verdicts for long strings already run through the base64 scan, keyed by
+# (length, first 64 chars, last 64 chars). The same screenshot is usually logged
+# with the request and again with the response, so repeats are common.
+BASE64_VERDICT_CACHE_SIZE = 1024
+_base64_verdicts = OrderedDict()
+_base64_verdicts_lock = threading.Lock()
+
+# Deletes the whitespace that can appear inside wrapped base64 text
+BASE64_WHITESPACE_TABLE = str.maketrans('', '', ' \t\n\r\x0b\x0c')
+
+# Base64 characters decoded per step when saving payload images (a multiple of 4)
+BASE64_DECODE_CHUNK = 64 * 1024
+
+# Directories ensure_dir has already created (or found) in this process
+_created_dirs = set()
+
+def ensure_dir(path: str, recheck: bool = False) -> None:
+    """os.makedirs(path, exist_ok=True), skipping the syscalls for directories already seen"""
+    if path in _created_dirs and not recheck:
+        return
+    os.makedirs(path, exist_ok=True)
+    _created_dirs.add(path)
+
+def write_all(fd: int, data) -> None:
+    """Write all of data to a raw file descriptor (os.write may write only part of it)"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def write_file_bytes(path: str, data: bytes) -> None:
+    """Write bytes to path with unbuffered os calls; a one-shot write gains nothing from a BufferedWriter"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        write_all(fd, data)
+    finally:
+        os.close(fd)
+
+def image_content_hasher():
+    """Incremental hasher for saved image filenames; the first 12 hex digits are used (not for security)"""
+    if HAS_BLAKE3:
+        return blake3.blake3()
+    return hashlib.blake2b(digest_size=6)
+
+# Payload value types the log payload walker handles, keyed by exact type
+PAYLOAD_NODE_TYPES = {dict: dict, list: list, str: str}
+
+def payload_node_type(value) -> Optional[type]:
+    """Walker type (dict, list or str) for a subclass of one of those, else None"""
+    for node_type in (dict, list, str):
+        if isinstance(value, node_type):
+            return node_type
+    return None
+
+def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, test_id: str = None, session_id: str = None,
+                                    stats: Dict = None) -> Dict:
     """
     Process a log payload to extract and save large base64 images to local files,
     replacing them with file references to reduce payload size.
@@ -499,13 +887,14 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
     """
     import os
     import base64
+    import binascii
     import hashlib
     import re
     import json
-    from copy import deepcopy
 
-    # Create a deep copy to avoid modifying the original payload
-    processed_payload = deepcopy(log_payload)
+    # No up-front deep copy: process_payload builds new containers as it walks,
+    # so the original payload is never modified and its large strings aren't duplicated
+    processed_payload = log_payload
 
     # Create the image_payloads directory if it doesn't exist
     image_dir = "image_payloads"
@@ -516,6 +905,15 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
     # Track statistics
     images_processed = 0
     bytes_saved = 0
+    chars_removed = 0  # Net length removed from strings by any replacement or truncation
+
+    # The large-string report below is info-level; skip building it when that's off
+    log_large_strings = logger.isEnabledFor(logging.INFO)
+
+    # References for images already saved in this payload, keyed by the base64 string.
+    # The same screenshot often appears more than once (e.g. again inside a *_json
+    # field); dict lookup checks identity before comparing contents.
+    saved_references = {}
 
     def is_base64_image(value: str) -> bool:
         """Check if a string looks like base64 encoded image data."""
@@ -526,35 +924,75 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
         if len(value) < 200:  # Much lower threshold
             return False
 
-        # Check for common base64 image prefixes (most reliable method)
-        image_prefixes = [
-            '/9j/',  # JPEG
-            'iVBORw0KGgoAAAANSUhEUgAA',  # PNG
-            'R0lGODlhAQABAIAAAAAAAP',  # GIF
-            'UklGRg==',  # WebP
-            'data:image/',  # Data URL prefix
-        ]
+        # Base64 text and data URLs start with an alphabet character (or wrapping whitespace);
+        # JSON, markup and most prose are rejected here before any scanning
+        if value[0] not in BASE64_LEADING_CHARS:
+            return False
 
+        # Check for common base64 image prefixes (most reliable method)
         # If it starts with a known image prefix, it's definitely an image
-        for prefix in image_prefixes:
-            if value.startswith(prefix):
+        if value.startswith(BASE64_IMAGE_PREFIXES):
+            if logger.isEnabledFor(logging.INFO):
+                prefix = next(p for p in BASE64_IMAGE_PREFIXES if value.startswith(p))
                 logger.info(f"🎯 Detected base64 image by prefix: {prefix}")
-                return True
+            return True
+
+        # Without a known prefix, only strings over 5000 chars can pass the checks below
+        if len(value) <= 5000:
+            return False
 
+        signature = (len(value), value[:64], value[-64:])
+        with _base64_verdicts_lock:
+            verdict = _base64_verdicts.get(signature)
+            if verdict is not None:
+                _base64_verdicts.move_to_end(signature)
+                return verdict
+
+        verdict = scan_for_base64(value)
+        with _base64_verdicts_lock:
+            _base64_verdicts[signature] = verdict
+            if len(_base64_verdicts) > BASE64_VERDICT_CACHE_SIZE:
+                _base64_verdicts.popitem(last=False)
+        return verdict
+
+    def scan_for_base64(value: str) -> bool:
+        """Full base64 analysis for long strings without a known image prefix."""
         # VERY aggressive base64 detection for any substantial string
         try:
-            # Remove any whitespace
-            clean_value = value.replace(' ', '').replace('\n', '').replace('\r', '').replace('\t', '')
-
-                        # If it's a reasonably long string, check if it might be base64
-            if len(clean_value) > 1000:  # Increased threshold to reduce false positives
+            # Sample the head first: most long strings are plain text and fail here
+            # without scanning the whole value
+            # bytes.translate deletes classes of bytes in C, which for a sample this small is
+            # several times cheaper than setting up a NumPy pass
+            head_bytes = value[:BASE64_SAMPLE_CHARS].encode('utf-8', 'ignore').translate(None, BASE64_WHITESPACE_BYTES)
+            head_other = len(head_bytes.translate(None, BASE64_ALPHABET_BYTES))
+            head_base64 = len(head_bytes) - head_other
+            if head_base64 < 0.9 * (head_base64 + head_other):
+                return False
+
+            # Classify every byte in one compiled/vectorized pass instead of building character sets;
+            # whitespace is ignored, anything non-ASCII counts against the ratio. The same pass
+            # decodes the first few base64 characters so image magic bytes can be checked without
+            # a trial decode
+            value_bytes = np.frombuffer(value.encode('utf-8', 'ignore'), dtype=np.uint8)
+            (other_count, base64_count, _), head = scan_base64_head(value_bytes, BASE64_BYTE_CLASS, BASE64_DECODE_TABLE)
+            clean_length = int(base64_count + other_count)
+
+            # If it's a reasonably long string, check if it might be base64
+            if clean_length > 1000:  # Increased threshold to reduce false positives
                 # Check if it contains mostly base64 characters (allow some flexibility)
-                base64_chars = set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=')
-                value_chars = set(clean_value)
-                base64_ratio = len(value_chars.intersection(base64_chars)) / len(value_chars) if value_chars else 0
+                base64_ratio = base64_count / clean_length
+
+                # Only the head is needed for the decode and pattern checks below
+                clean_value = value[:2000].replace(' ', '').replace('\n', '').replace('\r', '').replace('\t', '')
 
                 # More strict requirements to avoid false positives
-                if base64_ratio > 0.95 and len(clean_value) > 5000:  # 95% base64 chars and substantial length
+                if base64_ratio > 0.95 and clean_length > 5000:  # 95% base64 chars and substantial length
+                    # Decodes to known image magic bytes: no need for the text and decode checks
+                    image_format = detect_image_magic(head.tobytes())
+                    if image_format:
+                        logger.info(f"🎯 Detected base64 {image_format[0]} image by magic bytes: {len(value)} chars")
+                        return True
+
                     # Additional checks to avoid text being detected as base64
                     # Check if it looks like readable text (lots of spaces, common words)
                     if ' ' in value and any(word in value.lower() for word in ['the', 'and', 'you', 'that', 'with', 'this', 'screen', 'click', 'move']):
@@ -579,11 +1017,10 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
 
                 # Last resort: if it's very long and looks base64-ish, treat it as such
                 # But be more conservative to avoid false positives with JSON
-                if len(clean_value) > 20000:  # Only very long strings
-                    base64_pattern = re.compile(r'^[A-Za-z0-9+/]*={0,2}$')
-                    if base64_pattern.match(clean_value[:1000]):  # Test first 1000 chars
+                if clean_length > 20000:  # Only very long strings
+                    if is_base64_text(clean_value[:1000]):  # Test first 1000 chars
                         # Additional check: make sure it doesn't look like JSON
-                        if not (value.lstrip().startswith(('[', '{')) and value.rstrip().endswith((']', '}'))):
+                        if not looks_like_json_container(value):
                             logger.info(f"🎯 Detected large base64-like string: {len(value)} chars")
                             return True
 
@@ -592,73 +1029,73 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
 
         return False
 
-    def process_json_for_base64(obj, path: str = "") -> any:
-        """Recursively process parsed JSON to find and replace base64 images."""
-        nonlocal images_processed, bytes_saved
+    def process_json_for_base64(obj, path: str = "") -> Tuple[bool, Any]:
+        """Find and replace base64 images in freshly parsed JSON.
+
+        Walks the structure with an explicit stack rather than recursion and
+        replaces images in place, since the caller owns the object it just got
+        from json_loads. Returns (changed, obj).
+        """
+        changed = False
+        stack = [(obj, path)]
 
-        if isinstance(obj, dict):
-            result = {}
-            for key, value in obj.items():
-                current_path = f"{path}.{key}" if path else key
+        while stack:
+            node, node_path = stack.pop()
 
-                # Look for common base64 image locations
-                if key == "data" and isinstance(value, str) and len(value) > 200:
-                    # This is likely base64 image data in inlineData.data
-                    if is_base64_image(value):
+            if isinstance(node, dict):
+                # Assigning to existing keys while iterating is safe; the dict doesn't resize
+                for key, value in node.items():
+                    current_path = f"{node_path}.{key}" if node_path else key
+
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, current_path))
+                    # Covers inlineData.data, the usual home of base64 image data
+                    elif isinstance(value, str) and is_base64_image(value):
                         logger.info(f"🖼️  Found base64 image in JSON at {current_path} ({len(value)} chars)")
-                        result[key] = save_base64_image(value, f"json_{key}")
-                        continue
+                        node[key] = save_base64_image(value, f"json_{key}")
+                        changed = True
 
-                # Recursively process nested structures
-                if isinstance(value, (dict, list)):
-                    result[key] = process_json_for_base64(value, current_path)
-                elif isinstance(value, str) and is_base64_image(value):
-                    logger.info(f"🖼️  Found base64 image in JSON at {current_path} ({len(value)} chars)")
-                    result[key] = save_base64_image(value, f"json_{key}")
-                else:
-                    result[key] = value
-            return result
-
-        elif isinstance(obj, list):
-            result = []
-            for i, value in enumerate(obj):
-                current_path = f"{path}[{i}]"
-
-                if isinstance(value, (dict, list)):
-                    result.append(process_json_for_base64(value, current_path))
-                elif isinstance(value, str) and is_base64_image(value):
-                    logger.info(f"🖼️  Found base64 image in JSON at {current_path} ({len(value)} chars)")
-                    result.append(save_base64_image(value, f"json_list_{i}"))
-                else:
-                    result.append(value)
-            return result
+            elif isinstance(node, list):
+                for i, value in enumerate(node):
+                    current_path = f"{node_path}[{i}]"
 
-        else:
-            # Primitive value, return as-is
-            return obj
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, current_path))
+                    elif isinstance(value, str) and is_base64_image(value):
+                        logger.info(f"🖼️  Found base64 image in JSON at {current_path} ({len(value)} chars)")
+                        node[i] = save_base64_image(value, f"json_list_{i}")
+                        changed = True
+
+        return changed, obj
 
     def save_base64_image(base64_data: str, context_key: str = "unknown") -> str:
         """Save base64 image data to a file and return the file reference."""
         nonlocal images_processed, bytes_saved
 
+        reference = saved_references.get(base64_data)
+        if reference is not None:
+            bytes_saved += len(base64_data)
+            logger.info(f"♻️  Reusing saved image reference {reference} ({len(base64_data)} chars)")
+            return reference
+
         try:
-            # Handle data URLs (e.g., data:image/jpeg;base64,...)
+            # Handle data URLs (e.g., data:image/jpeg;base64,...); the header is parsed once
+            # here and its MIME type kept for format detection below
             actual_base64_data = base64_data
+            data_url_mime = ''
             if base64_data.startswith('data:'):
-                try:
-                    # Split data URL to get just the base64 part
-                    parts = base64_data.split(',', 1)
-                    if len(parts) == 2:
-                        actual_base64_data = parts[1]
-                        logger.info(f"Extracted base64 from data URL: {parts[0]}")
-                except Exception:
-                    logger.warning("Failed to parse data URL, using original data")
+                comma = base64_data.find(',')
+                if comma != -1:
+                    data_url_header = base64_data[:comma]
+                    actual_base64_data = base64_data[comma + 1:]
+                    data_url_mime = data_url_header[len('data:'):].split(';', 1)[0].lower()
+                    logger.info(f"Extracted base64 from data URL: {data_url_header}")
 
             # Clean and validate base64 data
             clean_base64 = actual_base64_data.strip()
 
             # Remove any whitespace or newlines
-            clean_base64 = ''.join(clean_base64.split())
+            clean_base64 = clean_base64.translate(BASE64_WHITESPACE_TABLE)
 
             # Add proper padding if needed
             missing_padding = len(clean_base64) % 4
@@ -667,180 +1104,179 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
                 logger.info(f"Added {4 - missing_padding} padding characters to base64")
 
             # Validate it looks like base64 before attempting decode
-            if not re.match(r'^[A-Za-z0-9+/]*={0,2}$', clean_base64):
+            if not is_base64_text(clean_base64):
                 logger.error(f"String doesn't look like valid base64: {actual_base64_data[:50]}...")
                 return f"[INVALID_BASE64: {len(base64_data)} chars]"
 
-            # Decode the base64 data
-            image_bytes = base64.b64decode(clean_base64)
-
-            # Create a hash of the image data for the filename
-            image_hash = hashlib.md5(image_bytes).hexdigest()[:12]
-
-            # Create a meaningful filename
-            timestamp = int(time.time())
-            filename_parts = [f"img_{timestamp}_{image_hash}"]
-
-            # Add context information if available
-            if client_id:
-                filename_parts.append(f"client_{client_id}")
-            if test_id:
-                filename_parts.append(f"test_{test_id}")
-            if session_id:
-                filename_parts.append(f"session_{session_id}")
-            if context_key != "unknown":
-                filename_parts.append(f"key_{context_key}")
-
-            # Enhanced image format detection
-            extension = 'bin'  # Default
-            mime_type = 'application/octet-stream'  # Default
-
-            # Check magic bytes for format detection
-            if len(image_bytes) >= 3 and image_bytes[:3] == b'\xff\xd8\xff':
-                extension = 'jpg'
-                mime_type = 'image/jpeg'
-            elif len(image_bytes) >= 8 and image_bytes[:8] == b'\x89PNG\r\n\x1a\n':
-                extension = 'png'
-                mime_type = 'image/png'
-            elif len(image_bytes) >= 6 and (image_bytes[:6] == b'GIF87a' or image_bytes[:6] == b'GIF89a'):
-                extension = 'gif'
-                mime_type = 'image/gif'
-            elif len(image_bytes) >= 12 and image_bytes[:4] == b'RIFF' and image_bytes[8:12] == b'WEBP':
-                extension = 'webp'
-                mime_type = 'image/webp'
-            elif len(image_bytes) >= 2 and image_bytes[:2] == b'BM':
-                extension = 'bmp'
-                mime_type = 'image/bmp'
-            elif len(image_bytes) >= 10 and image_bytes[6:10] in [b'JFIF', b'Exif']:
-                extension = 'jpg'
-                mime_type = 'image/jpeg'
-            else:
+            # Decode in chunks straight to a temporary file, hashing as we go, so the
+            # full decoded image is never held in memory alongside the base64 string
+            hasher = image_content_hasher()
+            # The magic bytes come from the first few characters, decoded once up front
+            # rather than checked for on every chunk
+            image_head = binascii.a2b_base64(clean_base64[:BASE64_HEAD_CHARS])
+            image_size = 0
+            fd, temp_path = tempfile.mkstemp(dir=image_dir, suffix='.part')
+            try:
+                # Chunks go straight to the descriptor; they're already larger than a write buffer
+                try:
+                    os.fchmod(fd, 0o644)  # mkstemp creates 0600; saved images are meant to be readable
+                    for i in range(0, len(clean_base64), BASE64_DECODE_CHUNK):
+                        chunk = binascii.a2b_base64(clean_base64[i:i + BASE64_DECODE_CHUNK])
+                        hasher.update(chunk)
+                        write_all(fd, chunk)
+                        image_size += len(chunk)
+                finally:
+                    os.close(fd)
+
+                # Create a hash of the image data for the filename
+                image_hash = hasher.hexdigest()[:12]
+
+                # Create a meaningful filename
+                timestamp = int(time.time())
+                filename_parts = [f"img_{timestamp}_{image_hash}"]
+
+                # Add context information if available
+                if client_id:
+                    filename_parts.append(f"client_{client_id}")
+                if test_id:
+                    filename_parts.append(f"test_{test_id}")
+                if session_id:
+                    filename_parts.append(f"session_{session_id}")
+                if context_key != "unknown":
+                    filename_parts.append(f"key_{context_key}")
+
+                # Enhanced image format detection
+                extension = 'bin'  # Default
+                mime_type = 'application/octet-stream'  # Default
+
+                # Check magic bytes for format detection
+                image_format = detect_image_magic(image_head)
+                if image_format:
+                    extension, mime_type = image_format
                 # Try to detect from original data URL if available
-                if base64_data.startswith('data:image/'):
-                    try:
-                        mime_part = base64_data.split(';')[0].replace('data:', '')
-                        if 'jpeg' in mime_part or 'jpg' in mime_part:
-                            extension = 'jpg'
-                            mime_type = 'image/jpeg'
-                        elif 'png' in mime_part:
-                            extension = 'png'
-                            mime_type = 'image/png'
-                        elif 'gif' in mime_part:
-                            extension = 'gif'
-                            mime_type = 'image/gif'
-                        elif 'webp' in mime_part:
-                            extension = 'webp'
-                            mime_type = 'image/webp'
-                    except Exception:
-                        pass
+                elif data_url_mime.startswith('image/'):
+                    extension, mime_type = DATA_URL_IMAGE_TYPES.get(data_url_mime[len('image/'):], (extension, mime_type))
 
-            filename = f"{'_'.join(filename_parts)}.{extension}"
-            filepath = os.path.join(image_dir, filename)
+                filename = f"{'_'.join(filename_parts)}.{extension}"
+                filepath = os.path.join(image_dir, filename)
 
-            # Save the image with proper binary mode
-            with open(filepath, 'wb') as f:
-                f.write(image_bytes)
+                # Move the decoded image into place under its final name
+                os.replace(temp_path, filepath)
+            except BaseException:
+                # Don't leave the .part file behind in image_dir if anything before the rename fails
+                os.unlink(temp_path)
+                raise
 
             images_processed += 1
             bytes_saved += len(base64_data)
 
-            logger.info(f"💾 Saved base64 image to {filepath} ({len(image_bytes)} bytes, {mime_type})")
+            logger.info(f"💾 Saved base64 image to {filepath} ({image_size} bytes, {mime_type})")
 
             # Return a simple string reference to keep JSON structure intact
-            return f"[IMAGE_SAVED: {filename}]"
+            reference = saved_references[base64_data] = f"[IMAGE_SAVED: {filename}]"
+            return reference
 
         except Exception as e:
             logger.error(f"❌ Failed to save base64 image: {e}")
             # Return a truncated version as fallback
             return f"[BASE64_IMAGE_SAVE_FAILED: {len(base64_data)} chars, error: {str(e)}]"
 
-    def process_dict(obj: Dict, path: str = "") -> Dict:
-        """Recursively process a dictionary to find and replace base64 images."""
-        result = {}
-
-        for key, value in obj.items():
-            current_path = f"{path}.{key}" if path else key
-
-            # Debug: log large strings to see what we're missing
-            if isinstance(value, str) and len(value) > 1000:
-                preview = value[:100] + "..." if len(value) > 100 else value
-                is_json_like = key.endswith('_json') or (value.lstrip().startswith(('[', '{')) and value.rstrip().endswith((']', '}')))
-                logger.info(f"🔍 Found large string at {current_path}: {len(value)} chars, JSON-like: {is_json_like}, preview: {preview}")
-
-            if isinstance(value, dict):
-                # Recursively process nested dictionaries
-                result[key] = process_dict(value, current_path)
-            elif isinstance(value, list):
-                # Process lists
-                result[key] = process_list(value, current_path)
-            elif isinstance(value, str) and is_base64_image(value):
-                # This looks like a base64 image, save it and replace with reference
-                logger.info(f"🖼️  Found base64 image at {current_path} ({len(value)} chars)")
-                result[key] = save_base64_image(value, key)
-            elif isinstance(value, str) and len(value) > 1000 and key.endswith('_json'):
-                # Special handling for JSON strings that might contain base64 images
-                try:
-                    logger.info(f"🔍 Processing JSON string at {current_path}")
-                    parsed_json = json.loads(value)
-                    processed_json = process_json_for_base64(parsed_json, current_path)
-                    result[key] = json.dumps(processed_json, default=str)
-                    logger.info(f"✅ Processed JSON string at {current_path}")
-                except json.JSONDecodeError:
-                    logger.warning(f"⚠️ Failed to parse JSON at {current_path}, treating as regular string")
-                    if len(value) > 10000:
-                        result[key] = f"[LARGE_STRING_TRUNCATED: {len(value)} chars]"
-                    else:
+    def process_string(value: str, current_path: str, context_key: str, key: str = None):
+        """Return the replacement for a string found in the payload (the value itself if unchanged).
+
+        key is the dict key the string sits under (None for list items);
+        '*_json' keys get their JSON parsed and searched for images.
+        """
+        # Debug: log large strings to see what we're missing
+        if len(value) > 1000 and log_large_strings:
+            preview = value[:100] + "..." if len(value) > 100 else value
+            is_json_like = (key is not None and key.endswith('_json')) or looks_like_json_container(value)
+            logger.info(f"🔍 Found large string at {current_path}: {len(value)} chars, JSON-like: {is_json_like}, preview: {preview}")
+
+        if is_base64_image(value):
+            # This looks like a base64 image, save it and replace with reference
+            logger.info(f"🖼️  Found base64 image at {current_path} ({len(value)} chars)")
+            return save_base64_image(value, context_key)
+        elif key is not None and len(value) > 1000 and key.endswith('_json'):
+            # Special handling for JSON strings that might contain base64 images
+            try:
+                logger.info(f"🔍 Processing JSON string at {current_path}")
+                parsed_json = json_loads(value)
+                changed, processed_json = process_json_for_base64(parsed_json, current_path)
+                logger.info(f"✅ Processed JSON string at {current_path}")
+                # Nothing replaced: keep the original string rather than re-serializing it
+                return json_text(processed_json) if changed else value
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️ Failed to parse JSON at {current_path}, treating as regular string")
+            except Exception as e:
+                logger.error(f"❌ Error processing JSON at {current_path}: {e}")
+            if len(value) > 10000:
+                return f"[LARGE_STRING_TRUNCATED: {len(value)} chars]"
+            return value
+        elif len(value) > 10000:
+            # Fallback: any very large string gets truncated
+            logger.warning(f"⚠️  Fallback truncation of large string at {current_path} ({len(value)} chars)")
+            return f"[LARGE_STRING_TRUNCATED: {len(value)} chars]"
+
+        # Keep the value as-is
+        return value
+
+    def process_payload(payload: Dict) -> Dict:
+        """Find and replace base64 images throughout a payload.
+
+        Walks nested dicts/lists with an explicit stack instead of recursion,
+        building new containers as it goes so the caller's payload is never modified.
+        """
+        nonlocal chars_removed
+        result_root = {}
+        stack = [(payload, result_root, "")]
+
+        while stack:
+            source, result, path = stack.pop()
+
+            # Items are classified by exact type with one dict lookup (payload_node_type
+            # only runs for anything else), and paths are only built for items that use them
+            if isinstance(source, dict):
+                for key, value in source.items():
+                    kind = PAYLOAD_NODE_TYPES.get(type(value)) or payload_node_type(value)
+
+                    if kind is None:
                         result[key] = value
-                except Exception as e:
-                    logger.error(f"❌ Error processing JSON at {current_path}: {e}")
-                    if len(value) > 10000:
-                        result[key] = f"[LARGE_STRING_TRUNCATED: {len(value)} chars]"
+                        continue
+
+                    current_path = f"{path}.{key}" if path else key
+                    if kind is str:
+                        result[key] = replacement = process_string(value, current_path, key, key)
+                        if replacement is not value:
+                            chars_removed += len(value) - len(replacement)
                     else:
-                        result[key] = value
-            elif isinstance(value, str) and len(value) > 10000:
-                # Fallback: any very large string gets truncated
-                logger.warning(f"⚠️  Fallback truncation of large string at {current_path} ({len(value)} chars)")
-                result[key] = f"[LARGE_STRING_TRUNCATED: {len(value)} chars]"
+                        result[key] = child = kind()
+                        stack.append((value, child, current_path))
             else:
-                # Keep the value as-is
-                result[key] = value
-
-        return result
-
-    def process_list(obj: list, path: str = "") -> list:
-        """Recursively process a list to find and replace base64 images."""
-        result = []
-
-        for i, value in enumerate(obj):
-            current_path = f"{path}[{i}]"
-
-            # Debug: log large strings to see what we're missing
-            if isinstance(value, str) and len(value) > 1000:
-                preview = value[:100] + "..." if len(value) > 100 else value
-                is_json_like = (value.lstrip().startswith(('[', '{')) and value.rstrip().endswith((']', '}')))
-                logger.info(f"🔍 Found large string at {current_path}: {len(value)} chars, JSON-like: {is_json_like}, preview: {preview}")
-
-            if isinstance(value, dict):
-                result.append(process_dict(value, current_path))
-            elif isinstance(value, list):
-                result.append(process_list(value, current_path))
-            elif isinstance(value, str) and is_base64_image(value):
-                logger.info(f"🖼️  Found base64 image at {current_path} ({len(value)} chars)")
-                result.append(save_base64_image(value, f"index_{i}"))
-            elif isinstance(value, str) and len(value) > 10000:
-                # Fallback: any very large string gets truncated
-                logger.warning(f"⚠️  Fallback truncation of large string at {current_path} ({len(value)} chars)")
-                result.append(f"[LARGE_STRING_TRUNCATED: {len(value)} chars]")
-            else:
-                result.append(value)
+                for i, value in enumerate(source):
+                    kind = PAYLOAD_NODE_TYPES.get(type(value)) or payload_node_type(value)
+
+                    if kind is None:
+                        result.append(value)
+                        continue
+
+                    current_path = f"{path}[{i}]"
+                    if kind is str:
+                        child = process_string(value, current_path, f"index_{i}")
+                        if child is not value:
+                            chars_removed += len(value) - len(child)
+                    else:
+                        child = kind()
+                        stack.append((value, child, current_path))
+                    result.append(child)
 
-        return result
+        return result_root
 
     # Add debugging to see payload structure
     logger.info(f"🔍 Processing payload with keys: {list(processed_payload.keys()) if isinstance(processed_payload, dict) else type(processed_payload)}")
 
     # Process the payload
-    processed_payload = process_dict(processed_payload)
+    processed_payload = process_payload(processed_payload)
 
     # Log processing statistics
     if images_processed > 0:
@@ -848,11 +1284,72 @@ def process_payload_for_size_limits(log_payload: Dict, client_id: str = None, te
     else:
         logger.warning("📊 No base64 images found in payload - check detection logic")
 
+    if stats is not None:
+        stats["images_processed"] = images_processed
+        stats["bytes_saved"] = bytes_saved
+        stats["chars_removed"] = chars_removed
+
     return processed_payload
 
+# Feedback logs are delivered by a background sender so agent steps don't wait on
+# payload processing and the /feedback round trip. /feedback takes one payload per
+# request, so the sender wakes for up to FEEDBACK_BATCH_SIZE events at a time and posts
+# them one by one over the shared HTTP_SESSION, in the order they were queued.
+FEEDBACK_BATCH_SIZE = 20
+FEEDBACK_FLUSH_INTERVAL = 0.5
+# Queued payloads can carry screenshots, so the backlog is bounded; when it's full the
+# caller waits up to FEEDBACK_PUT_TIMEOUT for room (slowing the producer down) and then
+# drops the event rather than sending it out of order
+FEEDBACK_QUEUE_SIZE = 256
+FEEDBACK_PUT_TIMEOUT = 5.0
+_feedback_queue = queue.Queue(maxsize=FEEDBACK_QUEUE_SIZE)
+
+def _feedback_sender_loop():
+    """Drain queued feedback logs, up to FEEDBACK_BATCH_SIZE per wake-up, one request each"""
+    while True:
+        batch = [_feedback_queue.get()]
+        deadline = time.time() + FEEDBACK_FLUSH_INTERVAL
+        while len(batch) < FEEDBACK_BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_feedback_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        for args, kwargs in batch:
+            try:
+                _deliver_log_to_remote(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"❌ Feedback sender failed: {e}")
+            finally:
+                _feedback_queue.task_done()
+
+_feedback_sender = threading.Thread(target=_feedback_sender_loop, name="feedback-sender", daemon=True)
+_feedback_sender.start()
+
+@atexit.register
+def _flush_feedback_queue(timeout: float = 10.0):
+    """Give queued feedback logs a chance to go out before the process exits"""
+    deadline = time.time() + timeout
+    while _feedback_queue.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.05)
+
 def _send_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: str,
                        client_id: str = None, test_id: str = None, session_id: str = None,
                        rabbitize_url: str = None, operator: str = None):
+    """Queue a log payload for the background feedback sender (see _deliver_log_to_remote)."""
+    kwargs = {"client_id": client_id, "test_id": test_id, "session_id": session_id,
+              "rabbitize_url": rabbitize_url, "operator": operator}
+    try:
+        _feedback_queue.put(((log_payload, endpoint_url, log_description), kwargs), timeout=FEEDBACK_PUT_TIMEOUT)
+    except queue.Full:
+        logger.error(f"❌ Feedback queue full ({FEEDBACK_QUEUE_SIZE}) for {FEEDBACK_PUT_TIMEOUT}s, dropping {log_description}")
+
+def _deliver_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: str,
+                       client_id: str = None, test_id: str = None, session_id: str = None,
+                       rabbitize_url: str = None, operator: str = None):
     """Helper function to send a log payload to the remote logging endpoint.
 
     If rabbitize_url and all required IDs are provided, will use the local /feedback endpoint.
@@ -863,16 +1360,20 @@ def _send_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: s
     """
     # Process the payload to handle large base64 images
     try:
-        # Calculate original payload size for debugging
-        original_size = len(json.dumps(log_payload, default=str))
-        logger.info(f"🔍 Original payload size: {original_size:,} bytes for {log_description}")
-
-        processed_payload = process_payload_for_size_limits(log_payload, client_id, test_id, session_id)
-
-        # Calculate processed payload size for debugging
-        processed_size = len(json.dumps(processed_payload, default=str))
-        size_reduction = original_size - processed_size
-        logger.info(f"🔍 Processed payload size: {processed_size:,} bytes (reduced by {size_reduction:,} bytes)")
+        stats = {}
+        processed_payload = process_payload_for_size_limits(log_payload, client_id, test_id, session_id, stats=stats)
+
+        # Serialize the processed payload once: its size is reported here and the same
+        # bytes become the "payload" field of the feedback request
+        payload_body = json_body(processed_payload, default=str)
+        processed_size = len(payload_body)
+        if logger.isEnabledFor(logging.INFO):
+            # The original size is estimated from what the walk removed rather than by
+            # serializing the original payload, screenshots and all, a second time
+            size_reduction = stats["chars_removed"]
+            original_size = processed_size + size_reduction
+            logger.info(f"🔍 Original payload size: ~{original_size:,} bytes for {log_description}")
+            logger.info(f"🔍 Processed payload size: {processed_size:,} bytes (reduced by ~{size_reduction:,} bytes)")
 
         if processed_size > 100000:  # Still over 100KB limit
             logger.warning(f"⚠️  Processed payload still large: {processed_size:,} bytes (limit: ~100KB)")
@@ -882,6 +1383,7 @@ def _send_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: s
         logger.error(f"❌ Failed to process payload for size limits: {e}")
         # Continue with original payload if processing fails
         processed_payload = log_payload
+        payload_body = None
 
     # Check if we can use the local feedback endpoint
     if rabbitize_url and client_id and test_id and session_id:
@@ -899,15 +1401,19 @@ def _send_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: s
             feedback_payload = {
                 "client_id": client_id,
                 "test_id": test_id,
-                "session_id": session_id,
-                "payload": processed_payload
+                "session_id": session_id
             }
 
             # Add operator if provided
             if operator:
                 feedback_payload["operator"] = operator
 
-            response = requests.post(f"{rabbitize_url}/feedback", json=feedback_payload, timeout=5)
+            if payload_body is None:
+                payload_body = json_body(processed_payload, default=str)
+            response = HTTP_SESSION.post(f"{rabbitize_url}/feedback",
+                                              data=json_body_with_raw_field(feedback_payload, "payload", payload_body),
+                                              headers={"Content-Type": "application/json"},
+                                              timeout=5)
             response.raise_for_status()
 
             filename = f"feedback_{operator}.json" if operator else "feedback_loop.json"
@@ -919,7 +1425,7 @@ def _send_log_to_remote(log_payload: Dict, endpoint_url: str, log_description: s
                 "status_code": e.response.status_code if e.response else None,
                 "response_text": e.response.text if e.response else None,
                 "url": f"{rabbitize_url}/feedback",
-                "payload_keys": list(feedback_payload.keys()),
+                "payload_keys": list(feedback_payload.keys()) + ["payload"],
                 "operator": operator,
                 "client_id": client_id,
                 "test_id": test_id,
@@ -1020,9 +1526,9 @@ def log_agent_thinking_event(
                     **base_log_payload,
                     "event_type": "llm_current_user_message",
                     "message_role": current_user_turn_message.get("role"),
-                    "message_parts_json": json.dumps(current_user_turn_message.get("parts"), default=str),
+                    "message_parts_json": json_text(current_user_turn_message.get("parts")),
                 }
-                if metadata: log_payload["metadata_json"] = json.dumps(metadata, default=str)
+                if metadata: log_payload["metadata_json"] = json_text(metadata)
                 _send_log_to_remote(log_payload, remote_log_url, f"llm_current_user_message for {client_id or 'N/A'}/{test_id or 'N/A'}",
                                    client_id=client_id, test_id=test_id, session_id=session_id, rabbitize_url=rabbitize_url, operator=operator)
 
@@ -1034,10 +1540,10 @@ def log_agent_thinking_event(
                     **base_log_payload,
                     "event_type": "llm_model_response_message",
                     "message_role": model_response_message.get("role"),
-                    "message_parts_json": json.dumps(model_response_message.get("parts"), default=str),
+                    "message_parts_json": json_text(model_response_message.get("parts")),
                     "candidate_index": cand_index,
                 }
-                if metadata: log_payload["metadata_json"] = json.dumps(metadata, default=str)
+                if metadata: log_payload["metadata_json"] = json_text(metadata)
                 _send_log_to_remote(log_payload, remote_log_url, f"llm_model_response_message (cand {cand_index}) for {client_id or 'N/A'}/{test_id or 'N/A'}",
                                    client_id=client_id, test_id=test_id, session_id=session_id, rabbitize_url=rabbitize_url, operator=operator)
 
@@ -1045,7 +1551,7 @@ def log_agent_thinking_event(
         error_details_payload = {}
         if response_data: # This is expected to contain error details from the API call
             if isinstance(response_data, dict):
-                error_details_payload["error_details_json"] = json.dumps(response_data, default=str)
+                error_details_payload["error_details_json"] = json_text(response_data)
             else:
                 error_details_payload["error_details_text"] = str(response_data)
 
@@ -1054,7 +1560,7 @@ def log_agent_thinking_event(
             "event_type": event_type, # Preserves "llm_response_error"
             **error_details_payload
         }
-        if metadata: log_payload["metadata_json"] = json.dumps(metadata, default=str)
+        if metadata: log_payload["metadata_json"] = json_text(metadata)
         _send_log_to_remote(log_payload, remote_log_url, f"llm_error_event ({event_type}) for {client_id or 'N/A'}/{test_id or 'N/A'}",
                            client_id=client_id, test_id=test_id, session_id=session_id, rabbitize_url=rabbitize_url, operator=operator)
     else:
@@ -1080,10 +1586,10 @@ def log_agent_thinking_event(
                     **base_log_payload,
                     "event_type": "llm_current_user_message",
                     "message_role": current_user_turn_message.get("role"),
-                    "message_parts_json": json.dumps(current_user_turn_message.get("parts"), default=str),
+                    "message_parts_json": json_text(current_user_turn_message.get("parts")),
                 }
                 operator = str(operator + '_other')
-                if metadata: log_payload["metadata_json"] = json.dumps(metadata, default=str)
+                if metadata: log_payload["metadata_json"] = json_text(metadata)
                 _send_log_to_remote(log_payload, remote_log_url, f"other_llm_current_user_message for {client_id or 'N/A'}/{test_id or 'N/A'}",
                                    client_id=client_id, test_id=test_id, session_id=session_id, rabbitize_url=rabbitize_url, operator=operator)
 
@@ -1173,10 +1679,9 @@ def save_to_gcs(client_id: str, test_id: str, path: str, data, content_type: str
         content_type = content_type or "application/octet-stream"
         save_data = data
     elif isinstance(data, dict) or isinstance(data, list):
-        # JSON data
-        json_data = json.dumps(data, ensure_ascii=False, default=str)
+        # JSON data (UTF-8, non-ASCII left unescaped)
         content_type = content_type or "application/json"
-        save_data = json_data.encode('utf-8')
+        save_data = json_body(data, default=str)
     elif isinstance(data, str):
         # String data
         content_type = content_type or "text/plain"
@@ -1190,11 +1695,15 @@ def save_to_gcs(client_id: str, test_id: str, path: str, data, content_type: str
     try:
         # Create directory structure if it doesn't exist
         local_dir = os.path.dirname(local_full_path)
-        os.makedirs(local_dir, exist_ok=True)
+        ensure_dir(local_dir)
 
         # Save the file locally
-        with open(local_full_path, 'wb') as f:
-            f.write(save_data)
+        try:
+            write_file_bytes(local_full_path, save_data)
+        except FileNotFoundError:
+            # The directory was removed after it was cached; recreate it and retry once
+            ensure_dir(local_dir, recheck=True)
+            write_file_bytes(local_full_path, save_data)
 
         logger.info(f"💾 Saved locally: {local_full_path}")
     except Exception as e:
@@ -1225,6 +1734,21 @@ def save_to_gcs(client_id: str, test_id: str, path: str, data, content_type: str
         # Even if GCS fails, we have local copy
         return True, local_full_path
 
+def _log_upload_failure(future):
+    """Done-callback for background saves: surface exceptions that would otherwise be dropped"""
+    exc = future.exception()
+    if exc is not None:
+        logger.error(f"❌ Background save failed: {exc}")
+
+def submit_upload(fn, *args, **kwargs):
+    """Run a save_to_gcs / save_debug_data call on the upload pool and return its Future"""
+    future = _UPLOAD_POOL.submit(fn, *args, **kwargs)
+    future.add_done_callback(_log_upload_failure)
+    return future
+
+# Concurrent saves per save_debug_data call (screenshot, OCR viz, metadata, step data)
+DEBUG_UPLOAD_WORKERS = 4
+
 def save_debug_data(client_id: str, test_id: str, step: int, screenshot: bytes, ui_elements: List[Dict],
                     matching_elements: List[Dict] = None, intent: str = None,
                     correction_applied: bool = False, step_data: Dict = None):
@@ -1254,19 +1778,14 @@ def save_debug_data(client_id: str, test_id: str, step: int, screenshot: bytes,
     #step_folder = f"step_{step}_{timestamp}"
     step_folder = f"step_{step}"
 
+    # Uploads are collected first and then saved concurrently, so the four
+    # saves cost one round-trip of latency instead of four in sequence
+    uploads = []  # (result key, path, data, content type, failure message)
+
     # 1. Save original screenshot (only if it's valid)
     if screenshot and len(screenshot) > 0:
-        try:
-            success, url = save_to_gcs(
-                client_id, test_id,
-                f"{step_folder}/original_screenshot.jpg",
-                screenshot,
-                "image/jpeg"
-            )
-            results["original_screenshot"] = {"success": success, "url": url if success else None}
-        except Exception as e:
-            logger.error(f"❌ Failed to save original screenshot: {e}")
-            results["original_screenshot"] = {"success": False, "error": str(e)}
+        uploads.append(("original_screenshot", f"{step_folder}/original_screenshot.jpg",
+                        screenshot, "image/jpeg", "❌ Failed to save original screenshot"))
     else:
         logger.warning("Empty screenshot provided, skipping screenshot storage")
         results["original_screenshot"] = {"success": False, "reason": "Empty screenshot"}
@@ -1275,13 +1794,8 @@ def save_debug_data(client_id: str, test_id: str, step: int, screenshot: bytes,
     if screenshot and len(screenshot) > 0 and ui_elements and len(ui_elements) > 0:
         try:
             ocr_viz = visualize_ocr_elements(screenshot, ui_elements, matching_elements)
-            success, url = save_to_gcs(
-                client_id, test_id,
-                f"{step_folder}/ocr_visualization.jpg",
-                ocr_viz,
-                "image/jpeg"
-            )
-            results["ocr_visualization"] = {"success": success, "url": url if success else None}
+            uploads.append(("ocr_visualization", f"{step_folder}/ocr_visualization.jpg",
+                            ocr_viz, "image/jpeg", "Failed to create OCR visualization"))
         except Exception as e:
             logger.error(f"Failed to create OCR visualization: {e}")
             results["ocr_visualization"] = {"success": False, "error": str(e)}
@@ -1315,40 +1829,45 @@ def save_debug_data(client_id: str, test_id: str, step: int, screenshot: bytes,
             for el in matching_elements
         ]
 
-    try:
-        success, url = save_to_gcs(
-            client_id, test_id,
-            f"{step_folder}/ocr_metadata.json",
-            ocr_metadata,
-            "application/json"
-        )
-        results["ocr_metadata"] = {"success": success, "url": url if success else None}
-    except Exception as e:
-        logger.error(f"Failed to save OCR metadata: {e}")
-        results["ocr_metadata"] = {"success": False, "error": str(e)}
+    uploads.append(("ocr_metadata", f"{step_folder}/ocr_metadata.json",
+                    ocr_metadata, "application/json", "Failed to save OCR metadata"))
 
     # 4. Save complete step data if provided
     if step_data:
+        # Remove large binary data to avoid storing duplicates
+        if "screenshot" in step_data:
+            step_data = {**step_data}  # Create a copy
+            step_data["screenshot"] = "<binary data removed>"
+
+        uploads.append(("step_data", f"{step_folder}/step_data.json",
+                        step_data, "application/json", "Failed to save step data"))
+
+    # A private pool rather than _UPLOAD_POOL: this may itself be running on an
+    # upload worker, and waiting on that same pool could starve it
+    with ThreadPoolExecutor(max_workers=DEBUG_UPLOAD_WORKERS) as pool:
+        pending = [
+            (name, failure, pool.submit(save_to_gcs, client_id, test_id, path, data, content_type))
+            for name, path, data, content_type, failure in uploads
+        ]
+
+    for name, failure, future in pending:
         try:
-            # Remove large binary data to avoid storing duplicates
-            if "screenshot" in step_data:
-                step_data = {**step_data}  # Create a copy
-                step_data["screenshot"] = "<binary data removed>"
-
-            success, url = save_to_gcs(
-                client_id, test_id,
-                f"{step_folder}/step_data.json",
-                step_data,
-                "application/json"
-            )
-            results["step_data"] = {"success": success, "url": url if success else None}
+            success, url = future.result()
+            results[name] = {"success": success, "url": url if success else None}
         except Exception as e:
-            logger.error(f"Failed to save step data: {e}")
-            results["step_data"] = {"success": False, "error": str(e)}
+            logger.error(f"{failure}: {e}")
+            results[name] = {"success": False, "error": str(e)}
 
     logger.info(f"Saved debug data to GCS for {client_id}/{test_id}/{step_folder}")
     return results
 
+def retry_backoff(attempt: int, base: float = 1.0, cap: float = 30.0, jitter: float = 0.5) -> float:
+    """Seconds to wait before retry number `attempt`: exponential, capped, with random jitter.
+
+    The jitter keeps concurrent sessions that failed together from retrying in lockstep.
+    """
+    return min(cap, base * (2 ** attempt)) * (1 + random.uniform(0, jitter))
+
 def call_gemini_api(payload, attempt=1, max_attempts=3, timeout=20):
     """
     Call the Gemini API with timeout protection
@@ -1356,9 +1875,9 @@ def call_gemini_api(payload, attempt=1, max_attempts=3, timeout=20):
     try:
         logger.api_call(f"Calling Gemini API (attempt {attempt}/{max_attempts})",
                        endpoint=GEMINI_API_URL.split('?')[0] + "?key=***")
-        response = requests.post(
+        response = HTTP_SESSION.post(
             GEMINI_API_URL,
-            json=payload,
+            data=json_body(payload),
             headers={"Content-Type": "application/json"},
             timeout=timeout
         )
@@ -1372,34 +1891,96 @@ def call_gemini_api(payload, attempt=1, max_attempts=3, timeout=20):
                 # Keep only the most recent message
                 payload["contents"] = payload["contents"][-2:]
                 logger.warning("📉 Reduced payload size due to timeout")
+            time.sleep(retry_backoff(attempt))
             return call_gemini_api(payload, attempt + 1, max_attempts, timeout)
         raise
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Request error on attempt {attempt}: {e}")
         if attempt < max_attempts:
+            time.sleep(retry_backoff(attempt))
             return call_gemini_api(payload, attempt + 1, max_attempts, timeout)
         raise
 
+async def call_gemini_api_async(payload, attempt=1, max_attempts=3, timeout=20):
+    """
+    Async variant of call_gemini_api for use from async handlers, so the event loop
+    isn't blocked for the length of the request
+    """
+    try:
+        logger.api_call(f"Calling Gemini API (attempt {attempt}/{max_attempts})",
+                       endpoint=GEMINI_API_URL.split('?')[0] + "?key=***")
+        response = await ASYNC_HTTP_CLIENT.post(
+            GEMINI_API_URL,
+            content=json_body(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.TimeoutException:
+        logger.warning(f"⏱️ Gemini API timeout on attempt {attempt}")
+        if attempt < max_attempts:
+            # Reduce payload size on timeout
+            if "contents" in payload and len(payload["contents"]) > 2:
+                # Keep only the most recent message
+                payload["contents"] = payload["contents"][-2:]
+                logger.warning("📉 Reduced payload size due to timeout")
+            await asyncio.sleep(retry_backoff(attempt))
+            return await call_gemini_api_async(payload, attempt + 1, max_attempts, timeout)
+        raise
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Request error on attempt {attempt}: {e}")
+        if attempt < max_attempts:
+            await asyncio.sleep(retry_backoff(attempt))
+            return await call_gemini_api_async(payload, attempt + 1, max_attempts, timeout)
+        raise
+
+# Keys whose long string values strip_base64_from_json replaces with a placeholder
+BASE64_FIELD_KEYS = frozenset(("data", "base64"))
 
 def strip_base64_from_json(data):
-    """Strip base64 data from JSON for logging purposes."""
+    """Strip base64 data from JSON for logging purposes.
+
+    Walks nested dicts/lists with an explicit stack, copying containers as it goes;
+    leaves are assigned directly rather than passed through another call.
+    """
     if isinstance(data, dict):
-        result = {}
-        for key, value in data.items():
-            if key in ["data", "base64"]:
-                # Check if this looks like base64 data (long string with specific character set)
-                if isinstance(value, str) and len(value) > 100:
-                    result[key] = f"[BASE64_DATA_STRIPPED: {len(value)} chars]"
-                else:
-                    result[key] = strip_base64_from_json(value)
-            else:
-                result[key] = strip_base64_from_json(value)
-        return result
+        root = {}
     elif isinstance(data, list):
-        return [strip_base64_from_json(item) for item in data]
+        root = []
     else:
         return data
 
+    stack = [(data, root)]
+    while stack:
+        source, result = stack.pop()
+        if isinstance(source, dict):
+            for key, value in source.items():
+                if isinstance(value, dict):
+                    result[key] = child = {}
+                    stack.append((value, child))
+                elif isinstance(value, list):
+                    result[key] = child = []
+                    stack.append((value, child))
+                elif key in BASE64_FIELD_KEYS and isinstance(value, str) and len(value) > 100:
+                    # Check if this looks like base64 data (long string with specific character set)
+                    result[key] = f"[BASE64_DATA_STRIPPED: {len(value)} chars]"
+                else:
+                    result[key] = value
+        else:
+            for value in source:
+                if isinstance(value, dict):
+                    child = {}
+                    stack.append((value, child))
+                elif isinstance(value, list):
+                    child = []
+                    stack.append((value, child))
+                else:
+                    child = value
+                result.append(child)
+
+    return root
+
 def prune_history(history, max_items=5):
     """
     Prune history to keep it at a manageable size by removing screenshots from older entries.
@@ -1415,21 +1996,16 @@ def prune_history(history, max_items=5):
     if not history or len(history) <= max_items:
         return history
 
-    # Calculate which entries should keep their screenshots (the most recent max_items)
-    keep_screenshot_indices = set(range(len(history) - max_items, len(history)))
-
-    # For older entries, remove screenshots but keep all text context
+    # For older entries (all but the most recent max_items), remove screenshots but keep
+    # all text context. The key is deleted outright so the bytes can be freed.
     screenshot_bytes_removed = 0
     entries_pruned = 0
 
-    for i in range(len(history)):
-        if i not in keep_screenshot_indices and 'screenshot' in history[i]:
+    for entry in history[:len(history) - max_items]:
+        screenshot = entry.pop('screenshot', None)
+        if screenshot is not None:
             # Store the size for logging
-            screenshot_size = len(history[i]['screenshot']) if history[i]['screenshot'] else 0
-            screenshot_bytes_removed += screenshot_size
-
-            # Remove the screenshot
-            history[i]['screenshot'] = b""
+            screenshot_bytes_removed += len(screenshot)
             entries_pruned += 1
 
     logger.info(f"🧹 Pruned screenshots from {entries_pruned} history entries, freed ~{screenshot_bytes_removed/1024:.1f}KB while preserving text context")
@@ -1446,7 +2022,7 @@ def start_session(rabbitize_url: str, target_url: str, max_retries: int, objecti
         try:
             # Updated to use /start endpoint with just the URL
             payload = {"url": target_url}
-            response = requests.post(f"{rabbitize_url}/start", json=payload, timeout=30)
+            response = HTTP_SESSION.post(f"{rabbitize_url}/start", json=payload, timeout=30)
             response.raise_for_status()
 
             # Extract sessionId from response
@@ -1469,7 +2045,29 @@ def start_session(rabbitize_url: str, target_url: str, max_retries: int, objecti
             logger.error(f"❌ Failed to start session (attempt {retries}/{max_retries}): {e}")
             if retries >= max_retries:
                 raise HTTPException(status_code=500, detail=f"Could not start session after {max_retries} attempts")
-            time.sleep(5)
+            time.sleep(retry_backoff(retries))
+
+def wait_for_file(path: str, timeout: float) -> bool:
+    """Wait up to timeout seconds for path to be written; returns whether it exists.
+
+    With inotify this returns as soon as a file of that name is closed after writing
+    or moved into place; otherwise it sleeps the full timeout and checks once.
+    """
+    directory, name = os.path.split(path)
+    if not HAS_INOTIFY or not os.path.isdir(directory):
+        time.sleep(timeout)
+        return os.path.exists(path)
+
+    deadline = time.monotonic() + timeout
+    with INotify() as inotify:
+        inotify.add_watch(directory, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+        # The file may have landed before the watch was in place
+        if os.path.exists(path):
+            return True
+        while (remaining := deadline - time.monotonic()) > 0:
+            if any(event.name == name for event in inotify.read(timeout=int(remaining * 1000) + 1)):
+                return True
+    return os.path.exists(path)
 
 def get_screenshot(rabbitize_runs_dir: str, client_id: str, test_id: str, session_id: str, step: int, max_retries: int = 40, retry_delay: int = 12) -> bytes:
     """Fetch the screenshot for the given step from the local filesystem."""
@@ -1492,22 +2090,31 @@ def get_screenshot(rabbitize_runs_dir: str, client_id: str, test_id: str, sessio
             else:
                 current_path = file_path
 
-            # Check if file exists
-            if os.path.exists(current_path):
+            # Open directly rather than checking existence first: one less stat per poll,
+            # and no window for the file to change between the check and the read
+            try:
                 with open(current_path, 'rb') as f:
                     content = f.read()
-                    elapsed = time.time() - start_time
-                    logger.success(f"📸 Screenshot for step {step} fetched successfully",
-                                 {"path": current_path, "elapsed": f"{elapsed:.2f}s", "attempts": attempt+1})
-                    return content
+            except FileNotFoundError:
+                content = None
+
+            if content is not None:
+                elapsed = time.time() - start_time
+                logger.success(f"📸 Screenshot for step {step} fetched successfully",
+                             {"path": current_path, "elapsed": f"{elapsed:.2f}s", "attempts": attempt+1})
+                return content
             else:
-                logger.info(f"Screenshot for step {step} not found at {current_path}, retrying in {retry_delay} seconds... (attempt {attempt+1}/{max_retries})")
-                time.sleep(retry_delay)
+                # Early polls come quickly since the screenshot usually lands soon after the
+                # command; later ones settle at retry_delay. wait_for_file returns early
+                # when the file is written.
+                delay = retry_backoff(attempt, base=retry_delay / 4, cap=retry_delay, jitter=0.1)
+                logger.info(f"Screenshot for step {step} not found at {current_path}, waiting up to {delay:.1f} seconds... (attempt {attempt+1}/{max_retries})")
+                wait_for_file(current_path, delay)
 
         except Exception as e:
             logger.error(f"Error while fetching screenshot: {e}")
             logger.info(f"Retrying after error (attempt {attempt+1}/{max_retries})")
-            time.sleep(retry_delay)
+            time.sleep(retry_backoff(attempt, base=retry_delay / 4, cap=retry_delay, jitter=0.1))
 
     raise HTTPException(status_code=404, detail=f"Screenshot for step {step} not found after {max_retries} attempts")
 
@@ -1532,7 +2139,7 @@ def get_dom_md(rabbitize_runs_dir: str, client_id: str, test_id: str, session_id
             if retries >= max_retries:
                 logger.warning(f"Failed to fetch DOM markdown after {max_retries} attempts. Proceeding without it.")
                 return ""
-            time.sleep(5)
+            time.sleep(retry_backoff(retries))
 
 def get_dom_coordinates(rabbitize_runs_dir: str, client_id: str, test_id: str, session_id: str, step: int, max_retries: int = 3) -> Dict:
     """
@@ -1560,25 +2167,26 @@ def get_dom_coordinates(rabbitize_runs_dir: str, client_id: str, test_id: str, s
             logger.info(f"Fetching DOM coordinates for step {step} (attempt {retries+1}/{max_retries})")
 
             if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    dom_data = json.load(f)
+                # Parsed from bytes so orjson (when available) can skip decoding to str first
+                with open(file_path, 'rb') as f:
+                    dom_data = json_loads(f.read())
                     elements_count = len(dom_data.get("elements", []))
                     logger.info(f"DOM coordinates fetched successfully for step {step}: {elements_count} elements")
                     return dom_data
             else:
                 logger.warning(f"DOM coordinates not found for step {step} at {file_path}, retrying...")
                 retries += 1
-                time.sleep(2)
+                time.sleep(retry_backoff(retries, base=0.5))
                 continue
 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in DOM coordinates file for step {step}: {e}")
             retries += 1
-            time.sleep(2)
+            time.sleep(retry_backoff(retries, base=0.5))
         except Exception as e:
             logger.error(f"Unexpected error fetching DOM coordinates for step {step}: {e}")
             retries += 1
-            time.sleep(2)
+            time.sleep(retry_backoff(retries, base=0.5))
 
     logger.warning(f"Failed to fetch DOM coordinates for step {step} after {max_retries} attempts")
     return {}
@@ -1605,7 +2213,7 @@ def send_command(rabbitize_url: str, session_id: str, tool_name: str, args: dict
     if tool_name == "move_mouse":
         x, y = args.get("x"), args.get("y")
         # Log the requested coordinates for debugging
-        logger.debug(f"🖱️ Mouse movement requested", {"x": x, "y": y})
+        logger.debug(f"🖱️ Mouse movement requested", lambda: {"x": x, "y": y})
 
         # Validate coordinates are within reasonable bounds
         if x is not None and y is not None:
@@ -1619,7 +2227,7 @@ def send_command(rabbitize_url: str, session_id: str, tool_name: str, args: dict
         try:
             payload = {"command": command}
             # Updated to use /execute endpoint
-            response = requests.post(f"{rabbitize_url}/execute", json=payload, timeout=5)
+            response = HTTP_SESSION.post(f"{rabbitize_url}/execute", json=payload, timeout=5)
             response.raise_for_status()
             logger.success(f"✅ Command sent successfully",
                          {"command": command, "session_id": session_id})
@@ -1629,7 +2237,7 @@ def send_command(rabbitize_url: str, session_id: str, tool_name: str, args: dict
             logger.error(f"Failed to send command {command} (attempt {retries}/{max_retries}): {e}")
             if retries >= max_retries:
                 raise HTTPException(status_code=500, detail=f"Could not send command after {max_retries} attempts")
-            time.sleep(5)
+            time.sleep(retry_backoff(retries))
 
 def end_session(rabbitize_url: str, session_id: str, max_retries: int = 3):
     """End a browser session via the Rabbitize API using /end endpoint."""
@@ -1637,7 +2245,7 @@ def end_session(rabbitize_url: str, session_id: str, max_retries: int = 3):
     while retries < max_retries:
         try:
             # Updated to use /end endpoint
-            response = requests.post(f"{rabbitize_url}/end", json={}, timeout=5)
+            response = HTTP_SESSION.post(f"{rabbitize_url}/end", json={}, timeout=5)
             response.raise_for_status()
             logger.info(f"Session ended for session_id: {session_id}")
             return
@@ -1646,15 +2254,156 @@ def end_session(rabbitize_url: str, session_id: str, max_retries: int = 3):
             logger.error(f"Failed to end session (attempt {retries}/{max_retries}): {e}")
             if retries >= max_retries:
                 logger.warning(f"Could not end session after {max_retries} attempts, continuing anyway")
+            else:
+                time.sleep(retry_backoff(retries))
+
+# Perceptual hashes of recent screenshots, keyed by a digest of the encoded bytes. Each
+# step hashes the same screenshot several times (get_next_action, the history entry and
+# compare_screenshots), so a handful of entries covers it.
+PHASH_CACHE_SIZE = 8
+_phash_cache = OrderedDict()
+_phash_cache_lock = threading.Lock()
+
+def screenshot_phash(image_bytes: bytes) -> imagehash.ImageHash:
+    """imagehash.phash of an encoded screenshot, memoized by content.
+
+    phash only looks at a 32x32 grayscale thumbnail, so JPEGs are decoded in draft mode
+    (libjpeg's DCT scaling to 1/8 size) rather than at full resolution.
+    """
+    key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    with _phash_cache_lock:
+        image_hash = _phash_cache.get(key)
+        if image_hash is not None:
+            _phash_cache.move_to_end(key)
+            return image_hash
+
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('L', (256, 256))
+    image_hash = imagehash.phash(image)
+    with _phash_cache_lock:
+        _phash_cache[key] = image_hash
+        if len(_phash_cache) > PHASH_CACHE_SIZE:
+            _phash_cache.popitem(last=False)
+    return image_hash
 
 def compute_image_hash(image_bytes: bytes) -> str:
     """Compute a perceptual hash of the image for comparison."""
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        return str(imagehash.phash(image))
+        return str(screenshot_phash(image_bytes))
     except Exception as e:
         return 0
 
+# Cursor dot colors as inclusive (lower, upper) bounds in OpenCV's BGR channel order,
+# checked in this order (with some tolerance around the pure colors)
+CURSOR_COLOR_RANGES = [
+    ("red", (np.array([0, 0, 180]), np.array([80, 80, 255]))),
+    ("green", (np.array([0, 180, 0]), np.array([80, 255, 80]))),
+    ("blue", (np.array([180, 0, 0]), np.array([255, 80, 80]))),
+]
+
+# detect_cursor decodes screenshots at 1/CURSOR_SCAN_SCALE resolution (JPEG DCT scaling);
+# the 20px cursor dot is still several pixels across at half size
+CURSOR_SCAN_SCALE = 2
+
+def cursor_color_sums_loop(region):
+    """Pixel count and x/y coordinate sums per cursor color, in one pass over a BGR region.
+
+    Rows of the result follow CURSOR_COLOR_RANGES (red, green, blue) and use the same
+    bounds; columns are (count, sum of x, sum of y). Meant to be compiled with Numba.
+    """
+    sums = np.zeros((3, 3), dtype=np.int64)
+    for y in range(region.shape[0]):
+        for x in range(region.shape[1]):
+            b = region[y, x, 0]
+            g = region[y, x, 1]
+            r = region[y, x, 2]
+            if r >= 180 and g <= 80 and b <= 80:
+                color = 0
+            elif g >= 180 and r <= 80 and b <= 80:
+                color = 1
+            elif b >= 180 and r <= 80 and g <= 80:
+                color = 2
+            else:
+                continue
+            sums[color, 0] += 1
+            sums[color, 1] += x
+            sums[color, 2] += y
+    return sums
+
+if HAS_NUMBA:
+    cursor_color_sums = njit(cache=True, nogil=True)(cursor_color_sums_loop)
+else:
+    cursor_color_sums = cursor_color_sums_loop
+
+def find_cursor_color_sums(region) -> Optional[Tuple[str, float, float]]:
+    """(color, mean x, mean y) of the first cursor color in a BGR region, from one cursor_color_sums pass"""
+    sums = cursor_color_sums(region)
+    for color_index, (color_name, _) in enumerate(CURSOR_COLOR_RANGES):
+        count = sums[color_index, 0]
+        if count:
+            return color_name, sums[color_index, 1] / count, sums[color_index, 2] / count
+    return None
+
+def find_cursor_color_moments(region) -> Optional[Tuple[str, float, float]]:
+    """Same result as find_cursor_color_sums, checking each color's mask in turn.
+
+    The centroid comes from the mask's image moments, so there's no separate pass to
+    collect pixel coordinates.
+    """
+    for color_name, (lower, upper) in CURSOR_COLOR_RANGES:
+        mask = cv2.inRange(region, lower, upper)
+        if cv2.countNonZero(mask):
+            moments = cv2.moments(mask, binaryImage=True)
+            return color_name, moments["m10"] / moments["m00"], moments["m01"] / moments["m00"]
+    return None
+
+# The compiled tally covers all three colors in a single pass; without Numba, OpenCV's
+# per-color masks are faster than the uncompiled loop
+find_cursor_color = find_cursor_color_sums if HAS_NUMBA else find_cursor_color_moments
+
+def find_cursor_in_region(img, x1: int, y1: int, x2: int, y2: int, scale: int = 1) -> Optional[Tuple[str, int, int]]:
+    """Return (color, cx, cy) for the first cursor color present in a box of a BGR image, else None.
+
+    The box and the returned centroid are in full-resolution coordinates; img may have
+    been decoded at 1/scale of that.
+    """
+    x1, y1 = x1 // scale, y1 // scale
+    found = find_cursor_color(img[y1:y2 // scale, x1:x2 // scale])
+    if found is None:
+        return None
+    color_name, mean_x, mean_y = found
+    # Each scaled pixel covers scale full-size pixels; map to the middle of them
+    offset = (scale - 1) / 2
+    return color_name, int((x1 + mean_x) * scale + offset), int((y1 + mean_y) * scale + offset)
+
+# Base64 text of recently encoded screenshots, keyed by id() of the bytes object. Each
+# entry holds the bytes themselves, so the id can't be reused while it's cached. The
+# last few history screenshots are re-sent on every Gemini turn, and the current one
+# goes into both the comparison and the action request.
+IMAGE_B64_CACHE_SIZE = 8
+_image_b64_cache = OrderedDict()
+_image_b64_cache_lock = threading.Lock()
+
+def encode_image_b64(image_bytes: bytes) -> str:
+    """Base64 text of an image for a Gemini inlineData part, reused when the same bytes are sent again"""
+    key = id(image_bytes)
+    with _image_b64_cache_lock:
+        entry = _image_b64_cache.get(key)
+        if entry is not None and entry[0] is image_bytes:
+            _image_b64_cache.move_to_end(key)
+            return entry[1]
+
+    if HAS_PYBASE64:
+        encoded = pybase64.b64encode_as_string(image_bytes)
+    else:
+        encoded = base64.b64encode(image_bytes).decode("ascii")
+    with _image_b64_cache_lock:
+        _image_b64_cache[key] = (image_bytes, encoded)
+        _image_b64_cache.move_to_end(key)
+        if len(_image_b64_cache) > IMAGE_B64_CACHE_SIZE:
+            _image_b64_cache.popitem(last=False)
+    return encoded
+
 def detect_cursor(screenshot: bytes, expected_x: int = None, expected_y: int = None) -> tuple[str, tuple[int, int]]:
     """
     Detect the cursor color and position in a screenshot - optimized for CPU-only environments.
@@ -1668,7 +2417,7 @@ def detect_cursor(screenshot: bytes, expected_x: int = None, expected_y: int = N
         tuple: (cursor_color, (x, y)) where cursor_color is 'red', 'green', 'blue', or 'not_found'
     """
     logger.debug(f"🔍 Starting cursor detection",
-                {"image_size": f"{len(screenshot)} bytes", "expected_coords": f"({expected_x}, {expected_y})"})
+                lambda: {"image_size": f"{len(screenshot)} bytes", "expected_coords": f"({expected_x}, {expected_y})"})
 
     if not screenshot:
         logger.warning("Empty screenshot provided to detect_cursor")
@@ -1679,8 +2428,9 @@ def detect_cursor(screenshot: bytes, expected_x: int = None, expected_y: int = N
         return "not_found", (expected_x or 0, expected_y or 0)
 
     try:
-        # Convert screenshot bytes to OpenCV format
-        img = cv2.imdecode(np.frombuffer(screenshot, np.uint8), -1)
+        # Convert screenshot bytes to OpenCV format (always 3-channel BGR), decoded at
+        # reduced size; coordinates below stay in full-resolution pixels
+        img = cv2.imdecode(np.frombuffer(screenshot, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
         if img is None:
             logger.warning("Could not decode screenshot for cursor detection")
             # Return the expected position if available, otherwise center
@@ -1689,85 +2439,41 @@ def detect_cursor(screenshot: bytes, expected_x: int = None, expected_y: int = N
             return "not_found", (960, 540)  # Assume center of 1920x1080 screen
 
         logger.info(f"Successfully decoded image: shape={img.shape}, type={img.dtype}")
+        scale = CURSOR_SCAN_SCALE
+        height, width = img.shape[0] * scale, img.shape[1] * scale
 
-        # Convert to RGB for easier color detection
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        logger.info("Successfully converted image to RGB")
-
-        # Define color ranges for cursor dots with more tolerance
-        red_lower = np.array([180, 0, 0])   # More permissive lower bound
-        red_upper = np.array([255, 80, 80]) # More permissive upper bound
-
-        green_lower = np.array([0, 180, 0])
-        green_upper = np.array([80, 255, 80])
-
-        blue_lower = np.array([0, 0, 180])
-        blue_upper = np.array([80, 80, 255])
-
-        # Create masks for each color using a more CPU-efficient approach
+        # Regions are searched in BGR directly (CURSOR_COLOR_RANGES is in BGR order), so
+        # the whole frame is never converted just to look at a few slices of it.
         # Use smaller regions if expected coordinates are provided
         if expected_x is not None and expected_y is not None:
             # Define a search region around expected coordinates
             search_radius = 50  # Increased radius to catch more potential cursors
             x_min = max(0, expected_x - search_radius)
             y_min = max(0, expected_y - search_radius)
-            x_max = min(img.shape[1], expected_x + search_radius)
-            y_max = min(img.shape[0], expected_y + search_radius)
+            x_max = min(width, expected_x + search_radius)
+            y_max = min(height, expected_y + search_radius)
 
             # Only process the focused region
-            region = img_rgb[y_min:y_max, x_min:x_max]
-
-            # Check for each color in the focused region
-            for color_name, (lower, upper) in [
-                ("red", (red_lower, red_upper)),
-                ("green", (green_lower, green_upper)),
-                ("blue", (blue_lower, blue_upper))
-            ]:
-                # Create mask for just this region
-                mask = cv2.inRange(region, lower, upper)
-                count = cv2.countNonZero(mask)
-
-                if count > 0:
-                    # Find coordinates of matching pixels
-                    y_indices, x_indices = np.where(mask > 0)
-
-                    if len(x_indices) > 0:
-                        # Calculate center of matching pixels
-                        cx = int(np.mean(x_indices)) + x_min
-                        cy = int(np.mean(y_indices)) + y_min
-                        logger.info(f"Found {color_name} cursor at ({cx}, {cy}) in focused region")
-                        return color_name, (cx, cy)
+            found = find_cursor_in_region(img, x_min, y_min, x_max, y_max, scale)
+            if found:
+                color_name, cx, cy = found
+                logger.info(f"Found {color_name} cursor at ({cx}, {cy}) in focused region")
+                return color_name, (cx, cy)
 
         # Check key regions if focused search failed
         key_regions = [
-            ((0, 0), (img.shape[1], 150), "top"),  # Top navigation
-            ((0, 0), (200, img.shape[0]), "left"),  # Left sidebar
-            ((img.shape[1]//2-300, img.shape[0]//2-300),
-             (img.shape[1]//2+300, img.shape[0]//2+300), "center")  # Center area
+            ((0, 0), (width, 150), "top"),  # Top navigation
+            ((0, 0), (200, height), "left"),  # Left sidebar
+            ((width//2-300, height//2-300),
+             (width//2+300, height//2+300), "center")  # Center area
         ]
 
         for (x1, y1), (x2, y2), region_name in key_regions:
-            region = img_rgb[y1:y2, x1:x2]
-
-            for color_name, (lower, upper) in [
-                ("red", (red_lower, red_upper)),
-                ("green", (green_lower, green_upper)),
-                ("blue", (blue_lower, blue_upper))
-            ]:
-                # Create mask for just this region
-                mask = cv2.inRange(region, lower, upper)
-                count = cv2.countNonZero(mask)
-
-                if count > 0:
-                    # Find coordinates of matching pixels
-                    y_indices, x_indices = np.where(mask > 0)
-
-                    if len(x_indices) > 0:
-                        # Calculate center of matching pixels
-                        cx = int(np.mean(x_indices)) + x1
-                        cy = int(np.mean(y_indices)) + y1
-                        logger.info(f"Found {color_name} cursor at ({cx}, {cy}) in {region_name} region")
-                        return color_name, (cx, cy)
+            found = find_cursor_in_region(img, x1, y1, x2, y2, scale)
+            if found:
+                color_name, cx, cy = found
+                logger.info(f"Found {color_name} cursor at ({cx}, {cy}) in {region_name} region")
+                return color_name, (cx, cy)
 
         # If cursor not found and we have expected coordinates, return those
         if expected_x is not None and expected_y is not None:
@@ -1776,7 +2482,7 @@ def detect_cursor(screenshot: bytes, expected_x: int = None, expected_y: int = N
 
         # No cursor found, no expected position - use center of screen as fallback
         logger.warning("No cursor found, returning center position")
-        center_x, center_y = img.shape[1] // 2, img.shape[0] // 2
+        center_x, center_y = width // 2, height // 2
         return "not_found", (center_x, center_y)
 
     except Exception as e:
@@ -1833,6 +2539,22 @@ def generate_cursor_visualization(screenshot: bytes, cursor_color: str, cursor_p
         logger.warning(f"Error generating cursor visualization: {e}")
         return screenshot
 
+# Phrases looked for in the intent alignment text (already lowercase). Each phrase
+# counts once if it appears anywhere, including inside a longer one ("success" in
+# "unsuccessful"), which the thresholds below were tuned against.
+PROGRESS_POSITIVE_INDICATORS = (
+    "successful", "success", "progress", "aligned", "intended",
+    "achieved", "moved", "changed", "clicked", "loaded", "appeared",
+    "correctly", "as expected", "visible", "displayed"
+)
+PROGRESS_NEGATIVE_INDICATORS = (
+    "not aligned", "unsuccessful", "failed", "no change", "same",
+    "stuck", "did not", "didn't", "hasn't", "no progress", "not as intended",
+    "not working", "unintended", "incorrect", "error", "missing"
+)
+# Phrases that settle a tie as "not making progress"
+PROGRESS_TIEBREAK_NEGATIVES = ("no change", "did not", "didn't", "hasn't", "same")
+
 def detect_progress_from_alignment(alignment_text: str) -> bool:
     """Analyze intent alignment text to determine if we're making progress.
 
@@ -1842,23 +2564,12 @@ def detect_progress_from_alignment(alignment_text: str) -> bool:
     if not alignment_text or len(alignment_text.strip()) == 0:
         return False
 
-    # Look for positive indicators in the alignment text
-    positive_indicators = [
-        "successful", "success", "progress", "aligned", "intended",
-        "achieved", "moved", "changed", "clicked", "loaded", "appeared",
-        "correctly", "as expected", "visible", "displayed"
-    ]
-
-    # Look for negative indicators in the alignment text
-    negative_indicators = [
-        "not aligned", "unsuccessful", "failed", "no change", "same",
-        "stuck", "did not", "didn't", "hasn't", "no progress", "not as intended",
-        "not working", "unintended", "incorrect", "error", "missing"
-    ]
+    # Lowercase once; every indicator check below runs against this copy
+    text = alignment_text.lower()
 
     # Count positive and negative indicators
-    positive_count = sum(1 for word in positive_indicators if word.lower() in alignment_text.lower())
-    negative_count = sum(1 for word in negative_indicators if word.lower() in alignment_text.lower())
+    positive_count = sum(word in text for word in PROGRESS_POSITIVE_INDICATORS)
+    negative_count = sum(word in text for word in PROGRESS_NEGATIVE_INDICATORS)
 
     # Analyze the sentiment of the alignment text
     logger.info(f"Progress analysis: positive={positive_count}, negative={negative_count} in: '{alignment_text}'")
@@ -1872,9 +2583,8 @@ def detect_progress_from_alignment(alignment_text: str) -> bool:
         return True
 
     # If tied or no indicators found, default based on the presence of negative phrases
-    for phrase in ["no change", "did not", "didn't", "hasn't", "same"]:
-        if phrase.lower() in alignment_text.lower():
-            return False
+    if any(phrase in text for phrase in PROGRESS_TIEBREAK_NEGATIVES):
+        return False
 
     # Default to making progress if we can't determine otherwise
     return True
@@ -1969,8 +2679,8 @@ def compare_screenshots(previous_screenshot: bytes, current_screenshot: bytes, l
             "role": "user",
             "parts": [
                 {"text": user_prompt},
-                {"inlineData": {"mimeType": "image/jpeg", "data": base64.b64encode(previous_screenshot).decode("utf-8")}},
-                {"inlineData": {"mimeType": "image/jpeg", "data": base64.b64encode(current_screenshot).decode("utf-8")}}
+                {"inlineData": {"mimeType": "image/jpeg", "data": encode_image_b64(previous_screenshot)}},
+                {"inlineData": {"mimeType": "image/jpeg", "data": encode_image_b64(current_screenshot)}}
             ]
         }
     ]
@@ -1988,7 +2698,7 @@ def compare_screenshots(previous_screenshot: bytes, current_screenshot: bytes, l
     }
 
     logger.debug("📊 Sending screenshot comparison request to Gemini API",
-                {"temperature": 0.1, "topP": 0.95, "topK": 40})
+                lambda: {"temperature": 0.1, "topP": 0.95, "topK": 40})
     try:
         # Log thinking event before API call
         log_agent_thinking_event(
@@ -2004,7 +2714,7 @@ def compare_screenshots(previous_screenshot: bytes, current_screenshot: bytes, l
             operator="validator"
         )
 
-        response = requests.post(GEMINI_API_FLASH_URL, json=payload, headers={"Content-Type": "application/json"}, timeout=30)
+        response = HTTP_SESSION.post(GEMINI_API_FLASH_URL, json=payload, headers={"Content-Type": "application/json"}, timeout=30)
         response.raise_for_status()
         result = response.json()
 
@@ -2037,8 +2747,8 @@ def compare_screenshots(previous_screenshot: bytes, current_screenshot: bytes, l
             logger.warning("No valid text in Gemini API response for screenshot comparison")
 
         # Calculate if there are visual changes (using phash)
-        prev_hash = imagehash.phash(Image.open(io.BytesIO(previous_screenshot)))
-        curr_hash = imagehash.phash(Image.open(io.BytesIO(current_screenshot)))
+        prev_hash = screenshot_phash(previous_screenshot)
+        curr_hash = screenshot_phash(current_screenshot)
         hash_distance = prev_hash - curr_hash
         has_visual_change = hash_distance > 5  # Threshold can be adjusted
 
@@ -2150,6 +2860,27 @@ def compare_screenshots(previous_screenshot: bytes, current_screenshot: bytes, l
         )
         return "", False, False
 
+# History turns sent to Gemini as full user/model exchanges; anything older is folded
+# into one condensed summary so the prompt stops growing with the session
+PROMPT_DETAILED_TURNS = 10
+# Characters kept from each explanation/outcome in the condensed summary
+PROMPT_SUMMARY_FIELD_CHARS = 120
+
+def summarize_history_turns(turns: list) -> str:
+    """One bulleted line per step for history turns too old to send in full"""
+    lines = [f"Summary of your first {len(turns)} steps (details omitted to keep the context short):"]
+    for step, turn in enumerate(turns, 1):
+        args_str = ", ".join(f"{k}={v}" for k, v in turn.get('args', {}).items())
+        line = f"- Step {step}: {turn.get('tool_name', 'unknown_tool')}({args_str})"
+        explanation = turn.get('agent_explanation')
+        if explanation:
+            line += f" because \"{explanation[:PROMPT_SUMMARY_FIELD_CHARS]}\""
+        outcome = turn.get('changes_description')
+        if outcome:
+            line += f"; outcome: \"{outcome[:PROMPT_SUMMARY_FIELD_CHARS]}\""
+        lines.append(line)
+    return "\n".join(lines)
+
 def calculate_action_diversity(history: list, window_size: int = 5) -> float:
     """Measures how diverse recent actions have been (0-1 scale).
 
@@ -2233,170 +2964,187 @@ def get_next_action(screenshot: bytes, objective: str, history: list, client_id:
     if diversity_score < 0.3 and len(history) >= 3:
         diversity_feedback = "Your recent actions have been very similar. Try a COMPLETELY different approach - move to a different area of the screen or try a different interaction type."
 
-    # Detect cursor position in the screenshot
-    expected_x, expected_y = None, None
-    if history and history[-1].get("tool_name") == "move_mouse" and history[-1].get("args"):
-        expected_x = history[-1]["args"].get("x")
-        expected_y = history[-1]["args"].get("y")
+    # Start the comparison with the previous screenshot (a Gemini round-trip) before the
+    # local cursor, DOM and OCR work below, so the two overlap instead of running back to back
+    last_command = None
+    compare_future = None
+    if history:
+        if history[-1].get("tool_name") and history[-1].get("args") is not None:
+            args_str = ", ".join([f"{k}={v}" for k, v in history[-1].get("args", {}).items()])
+            last_command = f"{history[-1]['tool_name']}({args_str})"
 
-    # If this is the first action, set expected position to center of screen
-    if not history:
-        expected_x, expected_y = 960, 540  # Center of 1920x1080 screen
-
-    # Call cursor detection function with a simple timeout
-    cursor_color, cursor_position = with_timeout(
-        detect_cursor,
-        args=(screenshot, expected_x, expected_y),
-        timeout_duration=5,
-        default=("not_found", (expected_x or 960, expected_y or 540))
-    )
-    logger.info(f"Detected cursor: {cursor_color} at position {cursor_position}")
+        # Skipped when stuck (see below), so only start it otherwise
+        if history[-1].get("stuck_counter", 0) < 3:
+            compare_deadline = time.monotonic() + 8
+            compare_future = _COMPARE_POOL.submit(
+                compare_screenshots, history[-1].get("screenshot"), screenshot, last_command,
+                history[-1].get("agent_explanation", ""), client_id, test_id, step, session_id, rabbitize_url)
 
-    # Generate enhanced screenshot with cursor highlighted if found
-    enhanced_screenshot = screenshot
-    if cursor_color != "not_found":
-        try:
-            enhanced_screenshot = generate_cursor_visualization(screenshot, cursor_color, cursor_position)
-        except Exception as e:
-            logger.error(f"Visualization generation failed: {e}", exc_info=True)
-            enhanced_screenshot = screenshot  # Fall back to original
+    try:
+        # Detect cursor position in the screenshot
+        expected_x, expected_y = None, None
+        if history and history[-1].get("tool_name") == "move_mouse" and history[-1].get("args"):
+            expected_x = history[-1]["args"].get("x")
+            expected_y = history[-1]["args"].get("y")
+
+        # If this is the first action, set expected position to center of screen
+        if not history:
+            expected_x, expected_y = 960, 540  # Center of 1920x1080 screen
+
+        # Call cursor detection function with a simple timeout
+        cursor_color, cursor_position = with_timeout(
+            detect_cursor,
+            args=(screenshot, expected_x, expected_y),
+            timeout_duration=5,
+            default=("not_found", (expected_x or 960, expected_y or 540))
+        )
+        logger.info(f"Detected cursor: {cursor_color} at position {cursor_position}")
 
-    # Prepare DOM elements information if available
-    dom_elements_text = ""
-    clickable_dom_count = 0
-    if dom_elements:
-        try:
-            dom_elements_text = prepare_dom_elements_for_prompt(dom_elements)
-            clickable_dom_count = len(filter_clickable_elements(dom_elements))
-            logger.info(f"Added {clickable_dom_count} interactive DOM elements to prompt")
-        except Exception as e:
-            logger.error(f"Failed to prepare DOM elements for prompt: {e}")
-
-    # Extract OCR elements ONLY when DOM data is insufficient or agent is stuck
-    # Priority: DOM elements > OCR fallback
-    ocr_elements_text = ""
-    should_run_ocr = (
-        (not dom_elements_text or clickable_dom_count < 3) or  # Insufficient DOM data
-        (stuck_counter > 1)  # Agent is stuck multiple times (more restrictive)
-    )
+        # Generate enhanced screenshot with cursor highlighted if found
+        enhanced_screenshot = screenshot
+        if cursor_color != "not_found":
+            try:
+                enhanced_screenshot = generate_cursor_visualization(screenshot, cursor_color, cursor_position)
+            except Exception as e:
+                logger.error(f"Visualization generation failed: {e}", exc_info=True)
+                enhanced_screenshot = screenshot  # Fall back to original
 
-    if should_run_ocr:
-        try:
-            if screenshot and len(screenshot) > 0:
-                logger.info(f"🔍 Using OCR fallback (DOM elements: {clickable_dom_count}, stuck: {stuck_counter > 1})")
-                # Use timeout to prevent OCR from blocking
-                ui_elements = with_timeout(
-                    extract_ui_elements_with_ocr,
-                    args=(screenshot,),
-                    timeout_duration=3,  # 3 second timeout
-                    default=[]
-                )
-                if ui_elements and len(ui_elements) > 0:
-                    # Generate OCR metadata for the LLM
-                    ocr_elements_text = generate_ui_element_metadata(ui_elements)
-                    logger.info(f"Added {len(ui_elements)} OCR text blocks to prompt")
-                else:
-                    logger.debug("No OCR text blocks extracted from screenshot")
-        except Exception as e:
-            logger.error(f"Failed to extract OCR elements for prompt: {e}")
-            ocr_elements_text = ""
-    else:
-        logger.debug(f"Skipping OCR - sufficient DOM data ({clickable_dom_count} elements) and agent not stuck")
-
-    if len(history) >= 1:
-        last_hash_str = history[-1].get("screenshot_hash")
-        last_command = None
-        last_tool_name = history[-1].get("tool_name", "")
-        stuck_counter = history[-1].get("stuck_counter", 0)
-
-        # Add special handling for move_mouse feedback
-        if last_tool_name == "move_mouse" and history[-1].get("args") is not None:
-            last_x = history[-1]["args"].get("x")
-            last_y = history[-1]["args"].get("y")
-            if last_x is not None and last_y is not None:
-                coordinate_feedback = f"Your last mouse move was to coordinates ({last_x}, {last_y}). Remember that x is HORIZONTAL (left to right, 0-1920) and y is VERTICAL (top to bottom, 0-1080). "
-
-                # Add feedback about cursor position vs expected position
-                if cursor_color != "not_found":
-                    actual_x, actual_y = cursor_position
-                    distance = ((actual_x - last_x) ** 2 + (actual_y - last_y) ** 2) ** 0.5
-                    if distance > 20:  # If cursor is far from where it was moved
-                        coordinate_feedback += f"Note: The cursor is {distance:.1f} pixels away from where you moved it. "
+        # Prepare DOM elements information if available
+        dom_elements_text = ""
+        clickable_dom_count = 0
+        if dom_elements:
+            try:
+                dom_elements_text = prepare_dom_elements_for_prompt(dom_elements)
+                clickable_dom_count = len(filter_clickable_elements(dom_elements))
+                logger.info(f"Added {clickable_dom_count} interactive DOM elements to prompt")
+            except Exception as e:
+                logger.error(f"Failed to prepare DOM elements for prompt: {e}")
+
+        # Extract OCR elements ONLY when DOM data is insufficient or agent is stuck
+        # Priority: DOM elements > OCR fallback
+        ocr_elements_text = ""
+        should_run_ocr = (
+            (not dom_elements_text or clickable_dom_count < 3) or  # Insufficient DOM data
+            (stuck_counter > 1)  # Agent is stuck multiple times (more restrictive)
+        )
 
-        if history[-1].get("tool_name") and history[-1].get("args") is not None:
-            args_str = ", ".join([f"{k}={v}" for k, v in history[-1].get("args", {}).items()])
-            last_command = f"{history[-1]['tool_name']}({args_str})"
+        if should_run_ocr:
+            try:
+                if screenshot and len(screenshot) > 0:
+                    logger.info(f"🔍 Using OCR fallback (DOM elements: {clickable_dom_count}, stuck: {stuck_counter > 1})")
+                    # Use timeout to prevent OCR from blocking
+                    ui_elements = with_timeout(
+                        extract_ui_elements_with_ocr,
+                        args=(screenshot,),
+                        timeout_duration=3,  # 3 second timeout
+                        default=[]
+                    )
+                    if ui_elements and len(ui_elements) > 0:
+                        # Generate OCR metadata for the LLM
+                        ocr_elements_text = generate_ui_element_metadata(ui_elements)
+                        logger.info(f"Added {len(ui_elements)} OCR text blocks to prompt")
+                    else:
+                        logger.debug("No OCR text blocks extracted from screenshot")
+            except Exception as e:
+                logger.error(f"Failed to extract OCR elements for prompt: {e}")
+                ocr_elements_text = ""
+        else:
+            logger.debug(f"Skipping OCR - sufficient DOM data ({clickable_dom_count} elements) and agent not stuck")
 
-        # Get a description of changes between the previous and current screenshots
         if len(history) >= 1:
-            prev_agent_explanation = history[-1].get("agent_explanation", "")
-
-            # Skip screenshot comparison for performance if we're stuck
-            if stuck_counter >= 3:
-                logger.info("Skipping screenshot comparison due to being stuck")
-                changes_description = "No significant visual changes detected."
-                is_making_progress = False
-                has_visual_change = False
-            else:
-                # No ThreadPoolExecutor - use simple compare_screenshots call with timeout
-                try:
-                    compare_result = with_timeout(
-                        compare_screenshots,
-                        args=(history[-1].get("screenshot"), screenshot, last_command, prev_agent_explanation, client_id, test_id, step, session_id, rabbitize_url),
-                        timeout_duration=8,
-                        default=("Screenshot comparison timed out.", False, False)
-                    )
-                    changes_description, is_making_progress, has_visual_change = compare_result
-                except Exception as e:
-                    logger.error(f"Screenshot comparison failed: {e}", exc_info=True)
-                    changes_description = "Screenshot comparison failed due to error."
+            last_hash_str = history[-1].get("screenshot_hash")
+            last_tool_name = history[-1].get("tool_name", "")
+            stuck_counter = history[-1].get("stuck_counter", 0)
+
+            # Add special handling for move_mouse feedback
+            if last_tool_name == "move_mouse" and history[-1].get("args") is not None:
+                last_x = history[-1]["args"].get("x")
+                last_y = history[-1]["args"].get("y")
+                if last_x is not None and last_y is not None:
+                    coordinate_feedback = f"Your last mouse move was to coordinates ({last_x}, {last_y}). Remember that x is HORIZONTAL (left to right, 0-1920) and y is VERTICAL (top to bottom, 0-1080). "
+
+                    # Add feedback about cursor position vs expected position
+                    if cursor_color != "not_found":
+                        actual_x, actual_y = cursor_position
+                        distance = ((actual_x - last_x) ** 2 + (actual_y - last_y) ** 2) ** 0.5
+                        if distance > 20:  # If cursor is far from where it was moved
+                            coordinate_feedback += f"Note: The cursor is {distance:.1f} pixels away from where you moved it. "
+
+            # Get a description of changes between the previous and current screenshots
+            if len(history) >= 1:
+                prev_agent_explanation = history[-1].get("agent_explanation", "")
+
+                # Skip screenshot comparison for performance if we're stuck
+                if stuck_counter >= 3:
+                    logger.info("Skipping screenshot comparison due to being stuck")
+                    changes_description = "No significant visual changes detected."
                     is_making_progress = False
                     has_visual_change = False
-
-            # Format the changes description if it contains both observed changes and intent alignment
-            formatted_changes = changes_description
-            if "OBSERVED:" in changes_description and "INTENT ALIGNMENT:" in changes_description:
-                parts = changes_description.split("INTENT ALIGNMENT:")
-                observed = parts[0].replace("OBSERVED:", "").strip()
-                alignment = parts[1].strip()
-                formatted_changes = f"{observed} Intent alignment: {alignment}"
-                logger.info(f"Intent evaluation: {alignment}")
-
-            # Store both the original and formatted descriptions
-            if changes_description and len(history) > 0:
-                history[-1]["changes_description"] = formatted_changes
-                history[-1]["raw_changes_description"] = changes_description
-                logger.info(f"Screenshot comparison with intent evaluation: {formatted_changes}")
-
-            # Update stuck counter based on progress assessment
-            if not is_making_progress and not has_visual_change:
-                stuck_counter += 1
-                logger.info(f"Stuck counter increased to {stuck_counter}")
-            else:
-                if stuck_counter > 0:
-                    logger.info(f"Resetting stuck counter from {stuck_counter} to 0")
-                stuck_counter = 0
-
-        if last_hash_str:
-            # Convert the last hash string to an ImageHash object
-            last_hash = imagehash.hex_to_hash(last_hash_str)
-            # Calculate the Hamming distance between the ImageHash objects
-            try:
-                distance = current_hash - last_hash
-            except:
-                distance = 0
-
-            logger.info(f"Distance between current and last screenshot: {distance}")
-            if distance < 5:  # Threshold can be adjusted
-                screenshot_reminder = (
-                    "The current screenshot is very similar to the previous one. "
-                    "This suggests your last action didn't change the screen significantly. "
-                    "Try a different approach."
-                )
-                # If no visual change, this is evidence of being stuck
-                if not has_visual_change and stuck_counter < 1:
+                else:
+                    # Collect the comparison started above, keeping its original 8 second budget
+                    try:
+                        compare_result = result_with_timeout(
+                            compare_future,
+                            "compare_screenshots",
+                            timeout_duration=max(0, compare_deadline - time.monotonic()),
+                            default=("Screenshot comparison timed out.", False, False)
+                        )
+                        changes_description, is_making_progress, has_visual_change = compare_result
+                    except Exception as e:
+                        logger.error(f"Screenshot comparison failed: {e}", exc_info=True)
+                        changes_description = "Screenshot comparison failed due to error."
+                        is_making_progress = False
+                        has_visual_change = False
+
+                # Format the changes description if it contains both observed changes and intent alignment
+                formatted_changes = changes_description
+                if "OBSERVED:" in changes_description and "INTENT ALIGNMENT:" in changes_description:
+                    parts = changes_description.split("INTENT ALIGNMENT:")
+                    observed = parts[0].replace("OBSERVED:", "").strip()
+                    alignment = parts[1].strip()
+                    formatted_changes = f"{observed} Intent alignment: {alignment}"
+                    logger.info(f"Intent evaluation: {alignment}")
+
+                # Store both the original and formatted descriptions
+                if changes_description and len(history) > 0:
+                    history[-1]["changes_description"] = formatted_changes
+                    history[-1]["raw_changes_description"] = changes_description
+                    logger.info(f"Screenshot comparison with intent evaluation: {formatted_changes}")
+
+                # Update stuck counter based on progress assessment
+                if not is_making_progress and not has_visual_change:
                     stuck_counter += 1
-                    logger.info(f"Stuck counter increased to {stuck_counter} due to similar screenshots")
+                    logger.info(f"Stuck counter increased to {stuck_counter}")
+                else:
+                    if stuck_counter > 0:
+                        logger.info(f"Resetting stuck counter from {stuck_counter} to 0")
+                    stuck_counter = 0
+
+            if last_hash_str:
+                # Convert the last hash string to an ImageHash object
+                last_hash = imagehash.hex_to_hash(last_hash_str)
+                # Calculate the Hamming distance between the ImageHash objects
+                try:
+                    distance = current_hash - last_hash
+                except:
+                    distance = 0
+
+                logger.info(f"Distance between current and last screenshot: {distance}")
+                if distance < 5:  # Threshold can be adjusted
+                    screenshot_reminder = (
+                        "The current screenshot is very similar to the previous one. "
+                        "This suggests your last action didn't change the screen significantly. "
+                        "Try a different approach."
+                    )
+                    # If no visual change, this is evidence of being stuck
+                    if not has_visual_change and stuck_counter < 1:
+                        stuck_counter += 1
+                        logger.info(f"Stuck counter increased to {stuck_counter} due to similar screenshots")
+    finally:
+        # An error before the comparison is collected would otherwise leave it unowned: cancel
+        # stops it if it is still queued for a worker, otherwise its result is simply dropped
+        if compare_future is not None and not compare_future.done():
+            compare_future.cancel()
 
     # Create message for most recent actions only
     last_three_actions = history[-3:] if len(history) >= 3 else history
@@ -2608,18 +3356,25 @@ def get_next_action(screenshot: bytes, objective: str, history: list, client_id:
     )
 
     contents = []
-    # Calculate which turns should include images (only the last 3)
-    keep_image_indices = set(range(max(0, len(history) - 3), len(history)))
 
-    # Process ALL history entries, not just the last 3
-    for i, turn in enumerate(history):
+    # The most recent PROMPT_DETAILED_TURNS entries are sent turn by turn; older ones are
+    # condensed into a summary at the start of the first detailed turn
+    first_detailed = max(0, len(history) - PROMPT_DETAILED_TURNS)
+    history_summary = summarize_history_turns(history[:first_detailed]) if first_detailed else None
+
+    for i in range(first_detailed, len(history)):
+        turn = history[i]
         # For image inclusion calculation, we need to know if this is one of the last 3 entries
         include_image = i >= len(history) - 3
 
         user_parts = []
+        if history_summary:
+            user_parts.append({"text": history_summary})
+            history_summary = None
+
         if include_image and turn.get('screenshot') and len(turn.get('screenshot', b'')) > 0:
             # Store reference to the image to avoid duplicate encoding
-            encoded_image = base64.b64encode(turn['screenshot']).decode("utf-8")
+            encoded_image = encode_image_b64(turn['screenshot'])
             logger.debug(f"Including screenshot for history turn {i}, image size: {len(encoded_image)} chars")
             user_parts.append({"text": "This was the screen state that led to your following action."}) # Text first
             user_parts.append({"inlineData": {"mimeType": "image/jpeg", "data": encoded_image}})
@@ -2662,7 +3417,7 @@ def get_next_action(screenshot: bytes, objective: str, history: list, client_id:
     if screenshot and len(screenshot) > 0:
         # Use the enhanced screenshot with cursor highlighted if available
         screenshot_to_use = enhanced_screenshot if cursor_color != "not_found" else screenshot
-        encoded_current_image = base64.b64encode(screenshot_to_use).decode("utf-8")
+        encoded_current_image = encode_image_b64(screenshot_to_use)
         logger.debug(f"Current screenshot size: {len(encoded_current_image)} chars")
 
         contents.append({
@@ -2712,17 +3467,16 @@ def get_next_action(screenshot: bytes, objective: str, history: list, client_id:
             }
         }
 
-        # Log the stripped version of the payload (without base64 data)
-        stripped_payload = strip_base64_from_json(payload)
-
+        # Log the size of the stripped payload (without base64 data); built lazily
+        # since stripping walks the whole request
         logger.api_call(f"Requesting next action from Gemini API",
                        endpoint="Gemini API",
-                       payload={
+                       payload=lambda: {
                            "temperature": current_temp,
                            "diversity": f"{diversity_score:.2f}",
                            "stuck_counter": stuck_counter,
                            "attempt": f"{attempt+1}/3",
-                           "payload_size": f"{len(str(stripped_payload))} chars"
+                           "payload_size": f"{len(str(strip_base64_from_json(payload)))} chars"
                        })
 
         # Log thinking event before API call
@@ -3069,7 +3823,8 @@ def coordinate_correction_helper(
                             debug_id = f"dom_correction_{int(time.time())}_{hash(intent) % 10000}"
 
                             # Store visualization and data
-                            save_to_gcs(
+                            submit_upload(
+                                save_to_gcs,
                                 client_id, test_id,
                                 #f"dom_correction_{step}_{int(time.time())}/visualization.jpg",
                                 f"dom_correction_{step}/visualization.jpg",
@@ -3078,7 +3833,8 @@ def coordinate_correction_helper(
                             )
 
                             # Store matching elements data
-                            save_to_gcs(
+                            submit_upload(
+                                save_to_gcs,
                                 client_id, test_id,
                                 #f"dom_correction_{step}_{int(time.time())}/matching_elements.json",
                                 f"dom_correction_{step}/matching_elements.json",
@@ -3206,7 +3962,7 @@ def coordinate_correction_helper(
             "role": "user",
             "parts": [
                 {"text": user_prompt},
-                {"inlineData": {"mimeType": "image/jpeg", "data": base64.b64encode(screenshot).decode("utf-8")}}
+                {"inlineData": {"mimeType": "image/jpeg", "data": encode_image_b64(screenshot)}}
             ]
         }
     ]
@@ -4139,7 +4895,7 @@ async def debug_ocr_test(url: str = None):
         # If URL is provided, download the image
         if url:
             try:
-                response = requests.get(url, timeout=10)
+                response = HTTP_SESSION.get(url, timeout=10)
                 response.raise_for_status()
                 test_image_bytes = response.content
                 logger.info(f"⬇️ Downloaded test image from URL",
@@ -4399,7 +5155,7 @@ async def start_task(task: TaskRequest):
                         # Validate screenshot data is not empty
                         if not screenshot or len(screenshot) == 0:
                             logger.error(f"Empty screenshot received, retrying...")
-                            time.sleep(2)
+                            time.sleep(retry_backoff(screenshot_attempt))
                             continue
 
                         # Try to decode the image to verify it's valid
@@ -4408,12 +5164,12 @@ async def start_task(task: TaskRequest):
                             img = cv2.imdecode(np.frombuffer(screenshot, np.uint8), -1)
                         except Exception as img_e:
                             logger.error(f"Failed to decode screenshot: {img_e}")
-                            time.sleep(2)
+                            time.sleep(retry_backoff(screenshot_attempt))
                             continue
 
                         if img is None:
                             logger.error("Failed to decode screenshot, retrying...")
-                            time.sleep(2)
+                            time.sleep(retry_backoff(screenshot_attempt))
                             continue
 
                         # Screenshot is valid
@@ -4422,7 +5178,7 @@ async def start_task(task: TaskRequest):
                         break
                     except Exception as e:
                         logger.error(f"Error getting screenshot: {e}", exc_info=True)
-                        time.sleep(2)
+                        time.sleep(retry_backoff(screenshot_attempt))
 
                 if not screenshot_success or screenshot is None or len(screenshot) == 0:
                     logger.error("Failed to obtain valid screenshot after multiple attempts")
@@ -4663,7 +5419,8 @@ async def start_task(task: TaskRequest):
                         # If DOM markdown is available, save truncated version for debugging
                         if dom_markdown and len(dom_markdown.strip()) > 0:
                             # Save it as a separate file to avoid bloating the step data
-                            save_to_gcs(
+                            submit_upload(
+                                save_to_gcs,
                                 client_id=client_id,
                                 test_id=test_id,
                                 #path=f"step_{step}_{int(time.time())}/dom_markdown.md",
@@ -4671,7 +5428,7 @@ async def start_task(task: TaskRequest):
                                 data=dom_markdown[:50000] if len(dom_markdown) > 50000 else dom_markdown,  # Truncate very large DOM markdown
                                 content_type="text/markdown"
                             )
-                            logger.info(f"Saved DOM markdown content to GCS for step {step}")
+                            logger.info(f"Queued DOM markdown content for GCS for step {step}")
 
                         # Extract OCR data if we're at a step where corrections might be needed
                         # (after move_mouse actions or when stuck)
@@ -4688,7 +5445,8 @@ async def start_task(task: TaskRequest):
                                 matching_elements = find_elements_matching_intent(ui_elements, text_feedback)
 
                                 # Save everything to GCS
-                                save_debug_data(
+                                submit_upload(
+                                    save_debug_data,
                                     client_id=client_id,
                                     test_id=test_id,
                                     step=step,
@@ -4699,10 +5457,11 @@ async def start_task(task: TaskRequest):
                                     correction_applied=correction_applied,
                                     step_data=step_data
                                 )
-                                logger.info(f"Saved step {step} debug data to GCS with OCR analysis")
+                                logger.info(f"Queued step {step} debug data for GCS with OCR analysis")
                             else:
                                 # Save without OCR if no elements found
-                                save_to_gcs(
+                                submit_upload(
+                                    save_to_gcs,
                                     client_id=client_id,
                                     test_id=test_id,
                                     #path=f"step_{step}_{int(time.time())}/step_data.json",
@@ -4710,7 +5469,8 @@ async def start_task(task: TaskRequest):
                                     data=step_data,
                                     content_type="application/json"
                                 )
-                                save_to_gcs(
+                                submit_upload(
+                                    save_to_gcs,
                                     client_id=client_id,
                                     test_id=test_id,
                                     path=f"step_{step}/screenshot.jpg",
@@ -4718,17 +5478,19 @@ async def start_task(task: TaskRequest):
                                     data=screenshot,
                                     content_type="image/jpeg"
                                 )
-                                logger.info(f"Saved step {step} debug data to GCS without OCR analysis")
+                                logger.info(f"Queued step {step} debug data for GCS without OCR analysis")
                         else:
                             # Save basic data without OCR
-                            save_to_gcs(
+                            submit_upload(
+                                save_to_gcs,
                                 client_id=client_id,
                                 test_id=test_id,
                                 #path=f"step_{step}_{int(time.time())}/step_data.json",
                                 path=f"step_{step}/step_data.json",
                                 data=step_data
                             )
-                            save_to_gcs(
+                            submit_upload(
+                                save_to_gcs,
                                 client_id=client_id,
                                 test_id=test_id,
                                 #path=f"step_{step}_{int(time.time())}/screenshot.jpg",
@@ -4736,7 +5498,7 @@ async def start_task(task: TaskRequest):
                                 data=screenshot,
                                 content_type="image/jpeg"
                             )
-                            logger.info(f"Saved step {step} basic data to GCS")
+                            logger.info(f"Queued step {step} basic data for GCS")
                     except Exception as e:
                         logger.error(f"Failed to save debug data to GCS: {e}")
 
@@ -4781,7 +5543,7 @@ async def start_task(task: TaskRequest):
         timeout_summary = "No actions were taken before the task timed out."
         if history: # Only generate summary if there's history
             logger.info(f"Generating timeout summary for {client_id}/{test_id} as max steps were reached.")
-            timeout_summary = generate_timeout_summary(objective, history, client_id, test_id, session_id, rabbitize_url)
+            timeout_summary = await generate_timeout_summary(objective, history, client_id, test_id, session_id, rabbitize_url)
         else:
             logger.info(f"No history to generate timeout summary for {client_id}/{test_id}.")
 
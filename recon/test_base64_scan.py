@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Checks for the base64 detection helpers used when trimming logged payloads.
+scan_base64_head has a Numba loop and a NumPy fallback; both must give the same (counts, head).
+"""
+
+import base64
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import (
+    BASE64_BYTE_CLASS,
+    BASE64_DECODE_TABLE,
+    BASE64_HEAD_CHARS,
+    detect_image_magic,
+    is_base64_text,
+    scan_base64_head,
+    scan_base64_head_loop,
+    scan_base64_head_numpy,
+)
+
+JPEG_BYTES = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01' + bytes(range(256)) * 4
+PNG_BYTES = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + bytes(range(64))
+WEBP_BYTES = b'RIFF\x24\x00\x00\x00WEBPVP8 ' + bytes(32)
+
+SCAN_CASES = {
+    "wrapped": base64.encodebytes(JPEG_BYTES).decode(),
+    "crlf wrapped": base64.encodebytes(JPEG_BYTES).decode().replace('\n', '\r\n'),
+    "unwrapped": base64.b64encode(PNG_BYTES).decode(),
+    "webp": base64.b64encode(WEBP_BYTES).decode(),
+    "padded one": base64.b64encode(b'ab').decode(),
+    "padded two": base64.b64encode(b'a').decode(),
+    "padding mid head": 'QUI=QUJDREVGR0hJ',
+    "invalid char": 'iVBO!Rw0KGgoAAAANSUhEUgAA',
+    "invalid char late": 'iVBORw0KGgoAAAA*NSUhEUgAA',
+    "non-ascii": 'iVBORw0Ké' + 'A' * 40,
+    "data url": 'data:image/png;base64,' + base64.b64encode(PNG_BYTES).decode(),
+    "leading whitespace": ' ' * 100 + base64.b64encode(PNG_BYTES).decode(),
+    "whitespace only": ' \n\t\r' * 30,
+    "spaced head": ' '.join(base64.b64encode(PNG_BYTES).decode()),
+    "empty": '',
+    "one char": 'Q',
+    "one group": 'QUJD',
+    "exact head": 'A' * BASE64_HEAD_CHARS,
+}
+
+def scan(fn, text):
+    counts, head = fn(np.frombuffer(text.encode('utf-8'), dtype=np.uint8), BASE64_BYTE_CLASS, BASE64_DECODE_TABLE)
+    return [int(c) for c in counts], bytes(head)
+
+def test_scan_base64_head_versions_match():
+    """The loop (as compiled by Numba) and the NumPy fallback agree on every input"""
+    for name, text in SCAN_CASES.items():
+        expected = scan(scan_base64_head_loop, text)
+        assert scan(scan_base64_head_numpy, text) == expected, name
+        assert scan(scan_base64_head, text) == expected, name
+
+def test_scan_base64_head_decodes_leading_bytes():
+    """head is the decoded start of the data, whitespace skipped"""
+    head_size = BASE64_HEAD_CHARS // 4 * 3
+    for fn in (scan_base64_head_loop, scan_base64_head_numpy):
+        assert scan(fn, SCAN_CASES["wrapped"])[1] == JPEG_BYTES[:head_size]
+        assert scan(fn, SCAN_CASES["leading whitespace"])[1] == PNG_BYTES[:head_size]
+        assert scan(fn, SCAN_CASES["spaced head"])[1] == PNG_BYTES[:head_size]
+        assert scan(fn, SCAN_CASES["padded one"])[1] == b''
+        assert scan(fn, SCAN_CASES["padding mid head"])[1] == b''
+        assert scan(fn, SCAN_CASES["invalid char"])[1] == base64.b64decode('iVBO')
+        assert scan(fn, SCAN_CASES["invalid char late"])[1] == base64.b64decode('iVBORw0KGgoA')
+        assert scan(fn, SCAN_CASES["one group"])[1] == b'ABC'
+
+def test_scan_base64_head_counts():
+    """counts is (other, base64 alphabet, whitespace) over the whole value"""
+    for fn in (scan_base64_head_loop, scan_base64_head_numpy):
+        assert scan(fn, 'QU JD\n==!')[0] == [1, 6, 2]
+        assert scan(fn, '')[0] == [0, 0, 0]
+
+def test_is_base64_text():
+    cases = {
+        'QUJD': True,
+        'QUI=': True,
+        'QQ==': True,
+        '': True,
+        'Q===': False,
+        'QU=J': False,
+        'QU JD': False,
+        'QUJD\n': False,
+        'a-b_': False,
+        'data:image/png;base64,QUJD': False,
+    }
+    for value, expected in cases.items():
+        assert is_base64_text(value) is expected, value
+
+def test_detect_image_magic():
+    cases = [
+        (JPEG_BYTES[:12], ('jpg', 'image/jpeg')),
+        (PNG_BYTES[:12], ('png', 'image/png')),
+        (b'GIF87a\x01\x00', ('gif', 'image/gif')),
+        (b'GIF89a\x01\x00', ('gif', 'image/gif')),
+        (WEBP_BYTES[:12], ('webp', 'image/webp')),
+        (b'RIFX\x24\x00\x00\x00WEBP', None),  # WEBP only counts inside a RIFF container
+        (b'\x00' * 8 + b'WEBP', None),
+        (b'BM\x36\x00\x00\x00', ('bmp', 'image/bmp')),
+        (b'\x00' * 6 + b'JFIF\x00\x01', ('jpg', 'image/jpeg')),
+        (b'\x00' * 6 + b'Exif\x00\x00', ('jpg', 'image/jpeg')),
+        (b'\x00' * 5 + b'JFIF', None),
+        (b'hello world!', None),
+        (b'', None),
+    ]
+    for head, expected in cases:
+        assert detect_image_magic(head) == expected, head
+
+def test_scanned_head_feeds_detect_image_magic():
+    for name, expected in (("wrapped", 'jpg'), ("unwrapped", 'png'), ("webp", 'webp')):
+        head = scan(scan_base64_head, SCAN_CASES[name])[1]
+        assert detect_image_magic(head)[0] == expected, name
+
+if __name__ == "__main__":
+    for test in (test_scan_base64_head_versions_match, test_scan_base64_head_decodes_leading_bytes,
+                 test_scan_base64_head_counts, test_is_base64_text, test_detect_image_magic,
+                 test_scanned_head_feeds_detect_image_magic):
+        test()
+        print(f"✅ {test.__name__}")
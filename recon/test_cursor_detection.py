@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Checks for cursor dot detection in screenshots.
+find_cursor_color has a Numba tally and a cv2.moments fallback; both must find the same
+color and centroid, and find_cursor_in_region must map a reduced-size decode back to
+full-resolution coordinates.
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from main import (
+    CURSOR_SCAN_SCALE,
+    cursor_color_sums,
+    cursor_color_sums_loop,
+    find_cursor_color_moments,
+    find_cursor_color_sums,
+    find_cursor_in_region,
+)
+
+# BGR, matching CURSOR_COLOR_RANGES
+DOT_COLORS = {"red": (0, 0, 255), "green": (0, 255, 0), "blue": (255, 0, 0)}
+# (center x, center y) in a 1920x1080 frame; odd and even, near an edge
+DOT_CENTERS = [(960, 540), (701, 333), (14, 1065)]
+DOT_RADIUS = 10
+
+def make_frame(color_name, center, background=(40, 40, 40)):
+    frame = np.full((1080, 1920, 3), background, dtype=np.uint8)
+    cv2.circle(frame, center, DOT_RADIUS, DOT_COLORS[color_name], thickness=-1)
+    return frame
+
+def dot_centroid(frame):
+    """Exact full-resolution centroid of the drawn dot"""
+    ys, xs = np.nonzero(frame.any(axis=2) & (frame.max(axis=2) == 255))
+    return xs.mean(), ys.mean()
+
+def decode(frame, flags):
+    """Round-trip a frame through JPEG like a Rabbitize screenshot"""
+    ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert ok
+    return cv2.imdecode(jpeg, flags)
+
+def find_with(finder, img, box, scale):
+    """find_cursor_in_region with the given color finder in place of the module's choice"""
+    chosen = main.find_cursor_color
+    main.find_cursor_color = finder
+    try:
+        return find_cursor_in_region(img, *box, scale)
+    finally:
+        main.find_cursor_color = chosen
+
+def test_color_sums_versions_match():
+    """The loop (as compiled by Numba) matches its uncompiled form"""
+    region = make_frame("green", (50, 60))[:120, :120]
+    assert np.array_equal(cursor_color_sums(region), cursor_color_sums_loop(region))
+
+def test_finders_match():
+    """The Numba tally and the moments fallback agree on color and centroid"""
+    for color_name in DOT_COLORS:
+        region = decode(make_frame(color_name, (60, 45)), cv2.IMREAD_COLOR)[:100, :150]
+        by_sums = find_cursor_color_sums(region)
+        by_moments = find_cursor_color_moments(region)
+        assert by_sums[0] == by_moments[0] == color_name
+        assert abs(by_sums[1] - by_moments[1]) < 1e-6 and abs(by_sums[2] - by_moments[2]) < 1e-6
+    empty = np.zeros((50, 50, 3), dtype=np.uint8)
+    assert find_cursor_color_sums(empty) is None and find_cursor_color_moments(empty) is None
+
+def test_find_cursor_in_region_full_and_reduced():
+    """Both finders land within 1px of the dot's full-resolution center, at full and reduced decode"""
+    for color_name in DOT_COLORS:
+        for center in DOT_CENTERS:
+            frame = make_frame(color_name, center)
+            expected_x, expected_y = dot_centroid(frame)
+            # Odd box edges exercise the // scale rounding
+            box = (max(0, center[0] - 101), max(0, center[1] - 77), min(1920, center[0] + 99), min(1080, center[1] + 103))
+            for img, scale in ((decode(frame, cv2.IMREAD_COLOR), 1),
+                               (decode(frame, cv2.IMREAD_REDUCED_COLOR_2), CURSOR_SCAN_SCALE)):
+                results = [find_with(finder, img, box, scale) for finder in (find_cursor_color_sums, find_cursor_color_moments)]
+                assert results[0] == results[1], (color_name, center, scale, results)
+                found_color, x, y = results[0]
+                assert found_color == color_name
+                assert abs(x - expected_x) <= 1 and abs(y - expected_y) <= 1, (color_name, center, scale, x, y)
+
+def test_find_cursor_in_region_misses_outside_box():
+    frame = decode(make_frame("red", (960, 540)), cv2.IMREAD_REDUCED_COLOR_2)
+    assert find_cursor_in_region(frame, 0, 0, 400, 400, CURSOR_SCAN_SCALE) is None
+
+if __name__ == "__main__":
+    for test in (test_color_sums_versions_match, test_finders_match,
+                 test_find_cursor_in_region_full_and_reduced, test_find_cursor_in_region_misses_outside_box):
+        test()
+        print(f"✅ {test.__name__}")
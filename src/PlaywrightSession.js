@@ -1321,6 +1321,9 @@ class PlaywrightSession {
         fsPromises.writeFile(latestPath, compressedBuffer)
       ]);
 
+      // Keep the latest frame in memory so API responses can return it without a disk read
+      this.latestScreenshotBuffer = compressedBuffer;
+
       // Emit high quality frame to stream clients
       if (global.frameEmitter && label === 'latest') {
         const sessionKey = `${this.clientId}/${this.testId}/${this.sessionId}`;
@@ -617,7 +617,7 @@ async function main() {
     });
 
     app.post('/start', async (req, res) => {
-      const { url, command, clientId, testId, sessionId } = req.body;
+      const { url, command, clientId, testId, sessionId, includeScreenshot } = req.body;
       if (!url) {
         return res.status(400).json({ error: 'URL is required' });
       }
@@ -686,13 +686,20 @@ async function main() {
           queueManager.enqueue('execute', { command: typedCommand });
         }
 
-        res.json({
+        const response = {
           success: true,
           message: command ? 'Session started and command queued' : 'Session started successfully',
           clientId: actualClientId,
           testId: actualTestId,
           sessionId: actualSessionId
-        });
+        };
+
+        // Optionally return the initial screenshot inline so clients can skip reading latest.jpg
+        if (includeScreenshot && session.latestScreenshotBuffer) {
+          response.screenshotB64 = session.latestScreenshotBuffer.toString('base64');
+        }
+
+        res.json(response);
       } catch (error) {
         res.status(500).json({
           success: false,